@@ -1,51 +1,109 @@
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_SAMPLE_TILES = 1  # The three-argument form checks one tile, as the workflows expect
+
+def get_sample_tile_paths(tile_dir, limit):
+    """
+    Return paths to up to limit sample PNG tiles in the given directory.
+    Uses an iterative os.scandir walk and stops as soon as enough are found, so
+    only a tiny part of a large tile pyramid is visited.
+    """
+    found = []
+    stack = [tile_dir]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith('.png') and entry.is_file(follow_symlinks=False):
+                    found.append(entry.path)
+                    if len(found) >= limit:
+                        return found
+    return found
 
 def get_sample_tile_path(tile_dir):
-    """Return the path to a sample PNG tile in the given directory."""
-    for root, dirs, files in os.walk(tile_dir):
-        for f in files:
-            if f.endswith('.png'):
-                return os.path.join(root, f)
-    return None
+    """Return the path to a sample PNG tile in the given directory, or None."""
+    paths = get_sample_tile_paths(tile_dir, 1)
+    return paths[0] if paths else None
 
-def check_s3_cache_control(bucket, s3_prefix, local_tile_path, tile_dir):
-    """Check the Cache-Control header of a sample tile uploaded to S3."""
-    import boto3
-    import botocore
-    s3 = boto3.client('s3')
+EXPECTED_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def get_s3_key(s3_prefix, local_tile_path, tile_dir):
+    """Map a local tile path to its S3 key under s3_prefix."""
     # Sanitize prefix to remove stray quotes
     s3_prefix = s3_prefix.strip('"\'')
     rel_path = os.path.relpath(local_tile_path, tile_dir)
     key = os.path.join(s3_prefix, rel_path)
-    key = key.replace('\\', '/').replace('//', '/')
-    try:
-        resp = s3.head_object(Bucket=bucket, Key=key)
+    return key.replace('\\', '/').replace('//', '/')
+
+def check_s3_cache_control_many(bucket, keys, max_workers=64):
+    """
+    HEAD many S3 keys concurrently through one pooled client.
+    Returns {key: head_object response, or None if the object does not exist}.
+    """
+    import boto3
+    import botocore
+    from botocore.config import Config
+    s3 = boto3.session.Session().client('s3', config=Config(
+        max_pool_connections=max_workers,
+        retries={'max_attempts': 3, 'mode': 'adaptive'}
+    ))
+    def head(key):
+        try:
+            return key, s3.head_object(Bucket=bucket, Key=key)
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] == '404':
+                return key, None
+            raise
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(executor.map(head, keys))
+
+def check_s3_cache_control_tiles(bucket, s3_prefix, local_tile_paths, tile_dir):
+    """
+    Check the Cache-Control header of several sample tiles uploaded to S3, with
+    the HEAD requests issued concurrently. Returns 3 if any header is wrong,
+    else 4 if any tile is missing, else 0. With a single tile these are the
+    same codes check_s3_cache_control has always returned.
+    """
+    keys = [get_s3_key(s3_prefix, path, tile_dir) for path in local_tile_paths]
+    responses = check_s3_cache_control_many(bucket, keys, max_workers=max(1, min(32, len(keys))))
+    wrong = missing = 0
+    for key in keys:
+        resp = responses[key]
+        if resp is None:
+            print(f"File {key} not found in S3. Skipping cache-control check.")
+            missing += 1
+            continue
         cache_control = resp.get('CacheControl')
         print(f"S3 object: s3://{bucket}/{key}")
         print(f"Cache-Control: {cache_control}")
-        if cache_control == "public, max-age=31536000, immutable":
-            print("✅ Cache-Control header is correct.")
-            return 0
-        else:
+        if cache_control != EXPECTED_CACHE_CONTROL:
             print(f"Cache-Control header is incorrect: {cache_control}")
-            return 3
-    except botocore.exceptions.ClientError as e:
-        if e.response['Error']['Code'] == '404':
-            print(f"File {key} not found in S3. Skipping cache-control check.")
-            return 4
-        else:
-            raise
+            wrong += 1
+    if wrong:
+        return 3
+    if missing:
+        return 4
+    print(f"✅ Cache-Control header is correct on {len(keys)} tile(s).")
+    return 0
+
+def check_s3_cache_control(bucket, s3_prefix, local_tile_path, tile_dir):
+    """Check the Cache-Control header of a sample tile uploaded to S3."""
+    return check_s3_cache_control_tiles(bucket, s3_prefix, [local_tile_path], tile_dir)
 
 if __name__ == "__main__":
-    if len(sys.argv) != 4:
-        print("Usage: python check_s3_cache_control.py <bucket> <s3_prefix> <local_tile_dir>")
+    if len(sys.argv) not in (4, 5):
+        print("Usage: python check_s3_cache_control.py <bucket> <s3_prefix> <local_tile_dir> [num_sample_tiles]")
+        print("Exit codes: 0 all sampled tiles OK, 3 a Cache-Control header is wrong, 4 a sampled tile is missing in S3")
         sys.exit(1)
     bucket = sys.argv[1]
     s3_prefix = sys.argv[2]
     tile_dir = sys.argv[3]
-    tile_path = get_sample_tile_path(tile_dir)
-    if not tile_path:
+    num_samples = int(sys.argv[4]) if len(sys.argv) == 5 else DEFAULT_SAMPLE_TILES
+    tile_paths = get_sample_tile_paths(tile_dir, num_samples)
+    if not tile_paths:
         print(f"No PNG tile found in {tile_dir}")
         sys.exit(1)
-    sys.exit(check_s3_cache_control(bucket, s3_prefix, tile_path, tile_dir))
+    sys.exit(check_s3_cache_control_tiles(bucket, s3_prefix, tile_paths, tile_dir))
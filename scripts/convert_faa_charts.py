@@ -1,15 +1,41 @@
 import os
 import subprocess
-import json
 from datetime import datetime, timezone
 import shutil
 import re
 import logging
 import argparse
+import functools
 from typing import List, Dict, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from tqdm import tqdm
 from pathlib import Path
+# The metadata file and journal are shared with download_faa_charts, so their
+# on-disk format lives in utils. Running this file directly puts scripts/ itself
+# on sys.path instead of the repo root.
+try:
+    from scripts.utils import dumps_json, loads_json, load_metadata_file, append_journal, clear_journal, backup_and_save_metadata
+except ImportError:
+    from utils import dumps_json, loads_json, load_metadata_file, append_journal, clear_journal, backup_and_save_metadata
+
+# GDAL Python bindings are optional: when present, palette checks and VRT
+# expansion run in-process instead of spawning gdalinfo/gdal_translate.
+try:
+    from osgeo import gdal
+    gdal.UseExceptions()
+except ImportError:
+    gdal = None
+# With the bindings, gdal2tiles can also be driven as a library (GDAL >= 3.2)
+try:
+    from osgeo_utils import gdal2tiles as gdal2tiles_lib
+except ImportError:
+    gdal2tiles_lib = None
+
+# oxipng is optional; it losslessly recompresses tiles for --optimize-png
+try:
+    import oxipng
+except ImportError:
+    oxipng = None
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
@@ -17,47 +43,110 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(mess
 REPO_ROOT = Path(__file__).resolve().parents[2]
 DOWNLOAD_DIR = REPO_ROOT / 'downloads'
 METADATA_PATH = Path(__file__).parent / 'metadata' / 'faa_chart_log.json'
+# Append-only log of per-file results, folded into METADATA_PATH on the next load
+JOURNAL_PATH = METADATA_PATH.with_suffix('.ndjson')
+_TIFF_SUFFIXES = ('.tif', '.tiff')
+_CLEAN_RE = re.compile(r'[^A-Za-z0-9_-]')
+# Palette check results, kept beside the charts they describe (not in the tracked metadata)
+PALETTE_CACHE_NAME = '.palette_cache.json'
+
+@functools.lru_cache(maxsize=None)
+def _find_tool(name: str) -> str:
+    """
+    Resolve a GDAL command-line tool on PATH once per process.
+    Raises FileNotFoundError if it is missing; only the subprocess fallbacks
+    call this, so importing the module or using the GDAL bindings never walks PATH.
+    """
+    path = shutil.which(name)
+    if path is None:
+        raise FileNotFoundError(f"Missing required GDAL tool: {name}")
+    return path
+
+def palette_signature(tiff_path: str) -> list:
+    """Identify a chart file's contents by [st_mtime_ns, st_size]."""
+    st = os.stat(tiff_path)
+    return [st.st_mtime_ns, st.st_size]
 
-def is_paletted_tiff(tiff_path: str) -> bool:
+def is_paletted_tiff(tiff_path: str, palette_cache: Optional[Dict[str, Dict]] = None) -> bool:
     """
     Returns True if the TIFF is paletted (ColorInterp=Palette), else False.
+    If palette_cache is given, a previous result for the same absolute path is
+    reused as long as its palette_signature is unchanged, and new results are
+    stored in it.
     """
+    key = os.path.abspath(tiff_path)
+    signature = None
+    if palette_cache is not None:
+        try:
+            signature = palette_signature(tiff_path)
+        except OSError:
+            pass
+        cached = palette_cache.get(key)
+        if signature and cached and cached.get('signature') == signature:
+            return cached['paletted']
     try:
-        result = subprocess.run([
-            'gdalinfo', tiff_path
-        ], capture_output=True, text=True, check=True)
-        return 'ColorInterp=Palette' in result.stdout
+        if gdal is not None:
+            ds = gdal.Open(tiff_path, gdal.GA_ReadOnly)
+            paletted = ds.GetRasterBand(1).GetColorInterpretation() == gdal.GCI_PaletteIndex
+        else:
+            result = subprocess.run([
+                _find_tool('gdalinfo'), tiff_path
+            ], capture_output=True, text=True, check=True)
+            paletted = 'ColorInterp=Palette' in result.stdout
     except Exception as e:
         logging.warning(f"⚠️ Could not check palette for {tiff_path}: {e}")
         return False
+    if signature:
+        palette_cache[key] = {'signature': signature, 'paletted': paletted}
+    return paletted
 
 def convert_to_rgba_vrt(tiff_path: str, vrt_path: str) -> bool:
     """
     Converts a paletted TIFF to an RGBA VRT using gdal_translate.
     """
     try:
+        if gdal is not None:
+            options = gdal.TranslateOptions(format='VRT', rgbExpand='rgba')
+            if gdal.Translate(vrt_path, tiff_path, options=options) is None:
+                raise RuntimeError("gdal.Translate returned no dataset")
+            return True
         subprocess.run([
-            'gdal_translate', '-of', 'vrt', '-expand', 'rgba', tiff_path, vrt_path
+            _find_tool('gdal_translate'), '-of', 'vrt', '-expand', 'rgba', tiff_path, vrt_path
         ], check=True)
         return True
     except Exception as e:
         logging.error(f"❌ Failed to convert {tiff_path} to RGBA VRT: {e}\nSkipping {tiff_path}.")
         return False
 
-def run_gdal2tiles(input_path: str, output_dir: str, zoom: str = "5-12") -> bool:
+@functools.lru_cache(maxsize=None)
+def gdal2tiles_supports_quiet() -> bool:
+    """
+    Probe once per process whether this gdal2tiles accepts --quiet.
+    The result is memoized (and inherited by forked conversion workers).
+    """
+    try:
+        result = subprocess.run([_find_tool('gdal2tiles.py'), '--help'], capture_output=True, text=True)
+        return '--quiet' in result.stdout or '--quiet' in result.stderr
+    except Exception as e:
+        logging.warning(f"⚠️ Could not probe gdal2tiles options: {e}")
+        return False
+
+def run_gdal2tiles(input_path: str, output_dir: str, zoom: str = "5-12", processes: int = 1) -> bool:
     """
     Convert a GeoTIFF into XYZ tiles using gdal2tiles.
+    Runs gdal2tiles in-process via osgeo_utils when available (no interpreter
+    start-up or GDAL driver registration per file), else runs gdal2tiles.py.
     Suppresses gdal2tiles progress bar and logs only concise status.
     Args:
         input_path (str): Path to the .tif input file
         output_dir (str): Destination directory for the tiles
         zoom (str): Zoom level range, e.g., "5-12"
+        processes (int): Number of gdal2tiles worker processes
     Returns:
         bool: True if successful, False otherwise
     """
     logging.info(f"🧱 Converting {os.path.basename(input_path)} to tiles...")
     try:
-        # Try to use --quiet if available, else suppress stdout/stderr
         cmd = [
             "gdal2tiles.py",
             "-z", zoom,
@@ -65,26 +154,30 @@ def run_gdal2tiles(input_path: str, output_dir: str, zoom: str = "5-12") -> bool
             "--tiledriver", "PNG",
             "--xyz",
             "-w", "none",
-            "--processes", "4",
-            "--quiet",  # This flag is available in most modern gdal2tiles
-            input_path,
-            output_dir
+            "--processes", str(processes),
+            "--resume",  # Keep tiles already written by an interrupted run
         ]
-        # Remove --quiet if not supported (fallback)
-        try:
+        if gdal2tiles_lib is not None:
+            try:
+                status = gdal2tiles_lib.main(cmd + ["--quiet", input_path, output_dir])
+            except SystemExit as e:  # gdal2tiles exits on argument/input errors
+                status = e.code
+            if status:
+                raise RuntimeError(f"gdal2tiles exited with status {status}")
+        else:
+            cmd[0] = _find_tool("gdal2tiles.py")
+            # Use --quiet if available, else just suppress stdout/stderr
+            if gdal2tiles_supports_quiet():
+                cmd.append("--quiet")
+            cmd += [input_path, output_dir]
             subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        except subprocess.CalledProcessError as e:
-            # If --quiet is not supported, try again without it
-            if 'unrecognized arguments: --quiet' in e.stderr.decode(errors='ignore'):
-                cmd.remove('--quiet')
-                subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            else:
-                raise
-        # Remove non-PNG files from output
-        for root, dirs, files in os.walk(output_dir):
-            for file in files:
-                if not file.endswith(".png"):
-                    os.remove(os.path.join(root, file))
+        # Remove non-PNG files from output. gdal2tiles only writes these
+        # (leaflet.html, openlayers.html, tilemapresource.xml, ...) at the
+        # top level, so there is no need to walk the whole z/x/y tree.
+        with os.scandir(output_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".png"):
+                    os.remove(entry.path)
         logging.info(f"✅ Tile conversion complete: {output_dir}")
         return True
     except subprocess.CalledProcessError as e:
@@ -98,37 +191,120 @@ def find_tiff_files(root_dir: str) -> List[str]:
     """
     Recursively find all .tif or .tiff files under root_dir.
     Returns a list of absolute file paths.
+    Hidden dirs and *_tiles pyramids from earlier runs are not descended into.
+    """
+    return find_files(root_dir, _TIFF_SUFFIXES, prune=_is_pruned_tiff_dir)
+
+def _is_pruned_tiff_dir(name: str) -> bool:
+    return name.startswith('.') or name.endswith('_tiles')
+
+def find_files(root_dir: str, suffixes: tuple, prune=None) -> List[str]:
+    """
+    Recursively find all files under root_dir whose lowercased name ends with one of suffixes.
+    Subdirectories whose name satisfies prune(name) are skipped entirely.
+    Walks with an iterative os.scandir stack so DirEntry type info is reused.
+    """
+    found = []
+    stack = [root_dir]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue  # Missing/unreadable dirs are skipped, like os.walk
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if prune is None or not prune(entry.name):
+                        stack.append(entry.path)
+                elif entry.name.lower().endswith(suffixes):
+                    found.append(entry.path)
+    return found
+
+def _optimize_png(png_path: str) -> bool:
+    """Recompress one PNG in place with oxipng (level 2, strip safe chunks)."""
+    try:
+        oxipng.optimize(png_path, level=2, strip=oxipng.StripChunks.safe())
+        return True
+    except Exception as e:
+        logging.warning(f"⚠️ Could not optimize {png_path}: {e}")
+        return False
+
+def optimize_tiles(tiles_dirs: List[str], workers: Optional[int] = None) -> int:
+    """
+    Losslessly recompress every PNG tile under tiles_dirs with oxipng, in
+    parallel across processes. Returns the number of tiles optimized; does
+    nothing if oxipng is not installed.
     """
-    tiffs = []
-    for dirpath, _, filenames in os.walk(root_dir):
-        for f in filenames:
-            if f.lower().endswith('.tif') or f.lower().endswith('.tiff'):
-                tiffs.append(os.path.join(dirpath, f))
-    return tiffs
+    if oxipng is None:
+        logging.warning("⚠️ oxipng is not installed; skipping PNG optimization.")
+        return 0
+    pngs = [png for tiles_dir in tiles_dirs for png in find_files(tiles_dir, ('.png',))]
+    if not pngs:
+        return 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 4) as executor:
+        results = list(tqdm(executor.map(_optimize_png, pngs, chunksize=64), total=len(pngs), desc="Optimizing PNGs", unit="tile"))
+    return sum(results)
 
+@functools.lru_cache(maxsize=4096)
 def clean_chart_name(name: str) -> str:
     """
     Clean chart name for use as a directory: remove/replace problematic characters.
     """
-    return re.sub(r'[^A-Za-z0-9_-]', '_', name.rsplit('.', 1)[0])
+    return _CLEAN_RE.sub('_', name.rsplit('.', 1)[0])
 
-def convert_tiff(tiff_path: str, zoom: str = "5-12", keep_vrt: bool = False) -> tuple:
+def tiles_exist(out_dir: str, zoom: str) -> bool:
+    """
+    Returns True if out_dir already holds a finished tile pyramid for zoom.
+    gdal2tiles writes the max-zoom base tiles first and the lowest zoom level
+    last, so a non-empty out_dir/<min_zoom>/ means a previous run completed.
+    out_dir/<max_zoom>/ must exist too, so a pyramid built for a narrower zoom
+    range (e.g. 5-11 when 5-12 is requested) is not mistaken for a finished one.
+    Only the first directory entry is read.
+    """
+    try:
+        min_zoom, _, max_zoom = zoom.partition('-')
+        if not os.path.isdir(os.path.join(out_dir, str(int(max_zoom or min_zoom)))):
+            return False
+        with os.scandir(os.path.join(out_dir, str(int(min_zoom)))) as it:
+            return any(True for _ in it)
+    except (OSError, ValueError):
+        return False
+
+def convert_tiff(tiff_path: str, zoom: str = "5-12", keep_vrt: bool = False, palette_cache: Optional[Dict[str, Dict]] = None, processes: int = 1) -> tuple:
     """
     Convert a single TIFF to tiles, handling palette. Returns (file_name, metadata_update_dict or None, success: bool).
+    palette_cache is passed through to is_paletted_tiff; processes to run_gdal2tiles.
     """
     file_name = os.path.basename(tiff_path)
     chart_name = clean_chart_name(file_name)
     out_dir = os.path.join(os.path.dirname(tiff_path), f"{chart_name}_tiles")
+    # A rerun after an aborted batch should not re-tile charts that finished
+    if tiles_exist(out_dir, zoom):
+        logging.info(f"⏩ Tiles already present, skipping: {out_dir}")
+        return (file_name, {
+            'converted': True,
+            'existing_tiles': True,
+            'tiles_dir': out_dir,
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        }, True)
     input_for_tiles = tiff_path
     vrt_path = None
     # If paletted, convert to RGBA VRT first
-    if is_paletted_tiff(tiff_path):
-        vrt_path = tiff_path + '.vrt'
+    if is_paletted_tiff(tiff_path, palette_cache):
+        if gdal is not None and gdal2tiles_lib is not None and not keep_vrt and processes == 1:
+            # Everything runs in this process, so the VRT can live in GDAL's
+            # in-memory filesystem instead of being written next to the TIFF.
+            # /vsimem is private to the process: gdal2tiles worker processes
+            # (processes > 1) could only see it when forked, so they get a file.
+            tiff_path = os.path.abspath(tiff_path)
+            vrt_path = f"/vsimem{tiff_path}.vrt"
+        else:
+            vrt_path = tiff_path + '.vrt'
         logging.info(f"🎨 TIFF is paletted, converting to RGBA VRT: {vrt_path}")
         if not convert_to_rgba_vrt(tiff_path, vrt_path):
             return (file_name, None, False)
         input_for_tiles = vrt_path
-    success = run_gdal2tiles(input_for_tiles, out_dir, zoom=zoom)
+    success = run_gdal2tiles(input_for_tiles, out_dir, zoom=zoom, processes=processes)
     metadata_update = None
     if success:
         metadata_update = {
@@ -139,16 +315,29 @@ def convert_tiff(tiff_path: str, zoom: str = "5-12", keep_vrt: bool = False) ->
             'timestamp': datetime.now(timezone.utc).isoformat()
         }
     # Clean up .vrt file if created
-    if vrt_path and os.path.exists(vrt_path) and not keep_vrt:
+    if vrt_path and vrt_path.startswith('/vsimem/'):
+        gdal.Unlink(vrt_path)
+    elif vrt_path and os.path.exists(vrt_path) and not keep_vrt:
         os.remove(vrt_path)
         logging.info(f"🧹 Removed VRT: {vrt_path}")
     return (file_name, metadata_update, success)
 
 
 def check_gdal_tools():
-    for tool in ['gdalinfo', 'gdal_translate', 'gdal2tiles.py']:
-        if shutil.which(tool) is None:
-            logging.critical(f"Missing required GDAL tool: {tool}")
+    """
+    Exit with one clear message if a GDAL command-line tool needed as a fallback
+    for missing Python bindings is not on PATH, instead of failing every TIFF.
+    """
+    tools = []
+    if gdal is None:
+        tools += ['gdalinfo', 'gdal_translate']
+    if gdal2tiles_lib is None:
+        tools.append('gdal2tiles.py')
+    for tool in tools:
+        try:
+            _find_tool(tool)
+        except FileNotFoundError as e:
+            logging.critical(str(e))
             exit(1)
 
 def validate_zoom(zoom: str) -> bool:
@@ -166,10 +355,11 @@ def parse_args() -> argparse.Namespace:
         """
     )
     parser.add_argument('--zoom', type=str, default=None, help='Zoom level range for gdal2tiles (e.g. 5-12)')
-    parser.add_argument('--workers', type=int, default=None, help='Number of parallel workers (default: 4)')
+    parser.add_argument('--workers', type=int, default=None, help='Number of parallel workers (default: CPU count)')
     parser.add_argument('--keep-vrt', action='store_true', help='Keep .vrt files after conversion (for debugging)')
     parser.add_argument('--chart-type', type=str, default=None, choices=['sectional', 'ifr_low', 'ifr_high'], help='Only process this chart type (for matrix jobs)')
     parser.add_argument('--single-tiff', type=str, help='Convert a single TIFF file and exit')
+    parser.add_argument('--optimize-png', action='store_true', help='Losslessly recompress new tiles with oxipng (requires the oxipng package)')
     return parser.parse_args()
 
 
@@ -180,39 +370,108 @@ def get_zoom_from_env_or_args(args: argparse.Namespace) -> str:
     return args.zoom or os.environ.get("FAA_TILE_ZOOM", "5-12")
 
 
-def get_workers_from_env_or_args(args: argparse.Namespace) -> int:
+def get_workers_from_env_or_args(args: argparse.Namespace) -> Optional[int]:
     """
-    Get number of parallel workers from env FAA_TILE_WORKERS or --workers argument, default to 4.
+    Get number of parallel workers from env FAA_TILE_WORKERS or --workers argument.
+    Returns None when neither is set so the worker count can follow the job count.
     """
-    return args.workers or int(os.environ.get("FAA_TILE_WORKERS", 4))
+    workers = args.workers or os.environ.get("FAA_TILE_WORKERS")
+    return int(workers) if workers else None
 
 
-def convert_single_tiff(tiff_path, zoom="5-12", keep_vrt=False, metadata=None):
-    """Convert a single TIFF file to tiles and update metadata if provided."""
-    file_name, metadata_update, success = convert_tiff(tiff_path, zoom, keep_vrt)
+def load_palette_cache(root_dir: str, tiff_files: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """
+    Load the palette cache kept in root_dir. On disk entries are keyed by path
+    relative to root_dir; the returned cache is keyed by absolute path. If
+    tiff_files is given, entries for charts no longer among them are dropped.
+    Missing or corrupt caches start empty.
+    """
+    try:
+        with open(os.path.join(root_dir, PALETTE_CACHE_NAME), 'rb') as f:
+            cache = loads_json(f.read())
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logging.warning(f"⚠️ Ignoring unreadable palette cache in {root_dir}: {e}")
+        return {}
+    root_dir = os.path.abspath(root_dir)
+    cache = {os.path.join(root_dir, rel): entry for rel, entry in cache.items()}
+    if tiff_files is None:
+        return cache
+    present = {os.path.abspath(path) for path in tiff_files}
+    return {path: entry for path, entry in cache.items() if path in present}
+
+def save_palette_cache(root_dir: str, cache: Dict[str, Dict]) -> None:
+    """Write the palette cache to root_dir; failures only cost a re-check next run."""
+    if not os.path.isdir(root_dir):
+        return
+    root_dir = os.path.abspath(root_dir)
+    cache = {os.path.relpath(path, root_dir): entry for path, entry in cache.items()}
+    try:
+        with open(os.path.join(root_dir, PALETTE_CACHE_NAME), 'wb') as f:
+            f.write(dumps_json(cache))
+    except OSError as e:
+        logging.warning(f"⚠️ Could not save palette cache in {root_dir}: {e}")
+
+def convert_single_tiff(tiff_path, zoom="5-12", keep_vrt=False, metadata=None, palette_cache=None):
+    """Convert a single TIFF file to tiles (using every core) and update metadata if provided."""
+    file_name, metadata_update, success = convert_tiff(tiff_path, zoom, keep_vrt, palette_cache, processes=os.cpu_count() or 1)
     if metadata is not None and success and metadata_update:
         metadata.setdefault('converted', {})[file_name] = metadata_update
-        backup_and_save_metadata(metadata, METADATA_PATH)
+        append_journal(JOURNAL_PATH, 'converted', file_name, metadata_update)
     if not success:
         logging.error(f"❌ Failed to convert {file_name}")
     return success
 
-def process_all_tiffs(tiff_files: List[str], metadata: Dict[str, Dict], zoom: str, workers: int, keep_vrt: bool = False) -> List[str]:
+def _convert_job(tiff_path: str, zoom: str, keep_vrt: bool, palette_cache: Dict[str, Dict], processes: int = 1) -> tuple:
+    """
+    Worker entry point for process_all_tiffs: convert one TIFF and hand back the
+    palette cache entries so the main process can merge them into metadata.
+    """
+    return convert_tiff(tiff_path, zoom, keep_vrt, palette_cache, processes), palette_cache
+
+def process_all_tiffs(tiff_files: List[str], metadata: Dict[str, Dict], zoom: str, workers: Optional[int] = None, keep_vrt: bool = False, palette_cache: Optional[Dict[str, Dict]] = None) -> List[str]:
     """
     Process all TIFFs in parallel, return a list of files that failed to convert.
-    Only update metadata in the main thread after all conversions.
+    Each TIFF is converted in its own worker process (default: min(number of
+    files, CPU count)), and each worker's gdal2tiles gets an equal share of the
+    remaining cores, so a short batch still uses the whole machine without
+    oversubscribing it.
+    Metadata (and palette_cache, if given) is only updated in the main process
+    as results come back.
     Shows a global progress bar for all conversions.
     """
     failed = []
     already_converted = set(metadata.get('converted', {}).keys())
     jobs = [tiff_path for tiff_path in tiff_files if os.path.basename(tiff_path) not in already_converted]
-    def tiff_task(tiff_path):
-        success = convert_single_tiff(tiff_path, zoom, keep_vrt, metadata)
-        if not success:
-            failed.append(os.path.basename(tiff_path))
-        return success
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        list(tqdm(executor.map(tiff_task, jobs), total=len(jobs), desc="Converting TIFFs", unit="file"))
+    if not jobs:
+        return failed
+    workers = workers or min(len(jobs), os.cpu_count() or 4)
+    processes = max(1, (os.cpu_count() or 1) // workers)
+    logging.info(f"🚀 Using {workers} parallel workers with {processes} gdal2tiles process(es) each.")
+    if palette_cache is None:
+        palette_cache = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for tiff_path in jobs:
+            # Only ship this file's cache entry to the worker
+            key = os.path.abspath(tiff_path)
+            job_cache = {key: palette_cache[key]} if key in palette_cache else {}
+            futures[executor.submit(_convert_job, tiff_path, zoom, keep_vrt, job_cache, processes)] = tiff_path
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Converting TIFFs", unit="file"):
+            file_name = os.path.basename(futures[future])
+            try:
+                (file_name, metadata_update, success), job_cache = future.result()
+                palette_cache.update(job_cache)
+            except Exception as e:
+                logging.error(f"❌ Worker failed on {file_name}: {e}")
+                metadata_update, success = None, False
+            if success and metadata_update:
+                metadata.setdefault('converted', {})[file_name] = metadata_update
+                append_journal(JOURNAL_PATH, 'converted', file_name, metadata_update)
+            else:
+                logging.error(f"❌ Failed to convert {file_name}")
+                failed.append(file_name)
     return failed
 
 
@@ -230,68 +489,68 @@ def print_conversion_summary(tiff_files: List[str], metadata: Dict, failed: List
     else:
         logging.info("🎉 All files converted successfully.")
 
-def backup_and_save_metadata(metadata: dict, path: Path) -> None:
+def load_metadata() -> dict:
     """
-    Backup the existing metadata file and atomically save the new metadata.
+    Load metadata from METADATA_PATH, then fold in records journaled by a run
+    that did not reach its final save. Corrupt files are logged and treated as empty.
     """
-    if path.exists():
-        shutil.copy(str(path), str(path) + '.bak')
-    tmp_path = str(path) + '.tmp'
-    with open(tmp_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
-    os.replace(tmp_path, path)
+    return load_metadata_file(METADATA_PATH, JOURNAL_PATH)
 
 def main() -> None:
     """
     Main conversion routine: finds TIFFs, handles palette, runs tiling, and logs results.
     """
-    check_gdal_tools()  # Ensure required GDAL tools are available before proceeding
-    # Load metadata if needed
-    if METADATA_PATH.exists():
-        with open(METADATA_PATH, 'r') as f:
-            metadata = json.load(f)
-    else:
-        metadata = {}
-
     args = parse_args()
+    check_gdal_tools()
+    if gdal2tiles_lib is None:
+        gdal2tiles_supports_quiet()  # Probe once here so forked workers inherit the answer
+    metadata = load_metadata()
+    metadata.pop('palette_cache', None)  # Older runs kept it in the tracked log
     # Add CLI for single-file conversion
-    import sys
     if args.single_tiff:
         tiff_path = args.single_tiff
         zoom = args.zoom or "5-12"
         keep_vrt = args.keep_vrt
-        # Load metadata if needed
-        if METADATA_PATH.exists():
-            with open(METADATA_PATH, 'r') as f:
-                metadata = json.load(f)
-        else:
-            metadata = {}
-        success = convert_single_tiff(tiff_path, zoom, keep_vrt, metadata)
+        tiff_root = os.path.dirname(os.path.abspath(tiff_path))
+        palette_cache = load_palette_cache(tiff_root)
+        success = convert_single_tiff(tiff_path, zoom, keep_vrt, metadata, palette_cache)
+        save_palette_cache(tiff_root, palette_cache)
+        entry = metadata.get('converted', {}).get(os.path.basename(tiff_path), {})
+        # As in batch mode, tiles left by an earlier run are not re-optimized
+        if success and args.optimize_png and not entry.get('existing_tiles'):
+            logging.info(f"🗜️ Optimized {optimize_tiles([entry['tiles_dir']])} PNG tiles.")
+        backup_and_save_metadata(metadata, METADATA_PATH)
+        clear_journal(JOURNAL_PATH)
         print(f"Single TIFF conversion {'succeeded' if success else 'failed'} for {tiff_path}")
         exit(0)
     # Only process TIFFs for the specified chart type if given
     if args.chart_type:
-        tiff_files = []
-        chart_dir = DOWNLOAD_DIR / args.chart_type
-        if chart_dir.exists():
-            for root, _, files in os.walk(str(chart_dir)):
-                for f in files:
-                    if f.lower().endswith('.tif') or f.lower().endswith('.tiff'):
-                        tiff_files.append(os.path.join(root, f))
+        tiff_root = str(DOWNLOAD_DIR / args.chart_type)
+        tiff_files = find_tiff_files(tiff_root)
         logging.info(f"Found {len(tiff_files)} TIFF files to convert for chart type {args.chart_type}.")
     else:
-        tiff_files = find_tiff_files(str(DOWNLOAD_DIR))
+        tiff_root = str(DOWNLOAD_DIR)
+        tiff_files = find_tiff_files(tiff_root)
         logging.info(f"Found {len(tiff_files)} TIFF files to convert.")
     zoom = get_zoom_from_env_or_args(args)
     if not validate_zoom(zoom):
         logging.critical(f"Invalid zoom value: {zoom}. Must be a number or range like 5-12.")
         exit(1)
     workers = get_workers_from_env_or_args(args)
-    logging.info(f"🚀 Using {workers} parallel workers.")
     # Process all TIFFs and update metadata
-    failed = process_all_tiffs(tiff_files, metadata, zoom, workers, keep_vrt=args.keep_vrt)
-    # Save metadata with backup and atomic write
+    previously_converted = set(metadata.get('converted', {}))
+    palette_cache = load_palette_cache(tiff_root, tiff_files)
+    failed = process_all_tiffs(tiff_files, metadata, zoom, workers, keep_vrt=args.keep_vrt, palette_cache=palette_cache)
+    save_palette_cache(tiff_root, palette_cache)
+    if args.optimize_png:
+        new_tiles_dirs = [
+            entry['tiles_dir'] for name, entry in metadata.get('converted', {}).items()
+            if name not in previously_converted and not entry.get('existing_tiles')
+        ]
+        logging.info(f"🗜️ Optimized {optimize_tiles(new_tiles_dirs, workers)} PNG tiles.")
+    # Save metadata once with backup and atomic write; the journal is now redundant
     backup_and_save_metadata(metadata, METADATA_PATH)
+    clear_journal(JOURNAL_PATH)
     print_conversion_summary(tiff_files, metadata, failed)
 
 if __name__ == "__main__":
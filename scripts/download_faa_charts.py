@@ -1,17 +1,33 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import os
+import sys
+import ctypes
+import re
+import io
 import zipfile
-import json
 from datetime import datetime, timezone
-import time
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 import shutil
+import tempfile
 import argparse
-from scripts.utils import download_and_extract_zip, backup_and_save_metadata
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from scripts.utils import (
+    download_and_extract_zip, backup_and_save_metadata,
+    load_metadata_file, append_journal, clear_journal
+)
+
+# lxml's C parser is much faster than the pure-Python html.parser; use it when installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
@@ -21,34 +37,67 @@ logger = logging.getLogger(__name__)
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 DOWNLOAD_DIR = os.path.join(REPO_ROOT, 'downloads')
 METADATA_PATH = os.path.join(os.path.dirname(__file__), 'metadata', 'faa_chart_log.json')
+# Per-chart completions are journaled here and folded into METADATA_PATH by the batch save
+JOURNAL_PATH = os.path.splitext(METADATA_PATH)[0] + '.ndjson'
 
 # FAA Chart URL and Prefix Constants
 VFR_CHARTS_URL = "https://www.faa.gov/air_traffic/flight_info/aeronav/digital_products/vfr/"
 IFR_CHARTS_URL = "https://www.faa.gov/air_traffic/flight_info/aeronav/digital_products/ifr/"
 
 # Prefixes for IFR charts to fetch
-IFR_LOW_PREFIXES = ["ELUS"]  # Enroute Low Altitude, Conterminous US
-IFR_HIGH_PREFIXES = ["EHUS"]  # Enroute High Altitude, Conterminous US
+# Tuples, so they can be handed straight to str.startswith
+IFR_LOW_PREFIXES = ("ELUS",)  # Enroute Low Altitude, Conterminous US
+IFR_HIGH_PREFIXES = ("EHUS",)  # Enroute High Altitude, Conterminous US
+IFR_ALL_PREFIXES = IFR_LOW_PREFIXES + IFR_HIGH_PREFIXES
 IFR_SKIP_PREFIXES = (
     'ELAK', 'EHAA', 'ELHI', 'EHPH', 'ELPA', 'EHPA', 'AREA', 'EHAK', 'EPHI'  # Removed duplicate 'EHPH'
 )
 
+# Only the parts of each index page that are searched get built into a bs4 tree
+VFR_TAB_IDS = ['sectional', 'terminalArea']
+_VFR_TABS_ONLY = SoupStrainer('div', id=VFR_TAB_IDS)
+_TABLES_ONLY = SoupStrainer('table')
+
+# Published dates in the IFR tables look like "Jul 10 2025"
+_DATE_RE = re.compile(r'([A-Z][a-z]{2} \d{1,2} \d{4})')
+# Dates embedded in chart zip file names, e.g. .../SEA_20250711.zip
+URL_DATE_RE = re.compile(r'(\d{4}-\d{2}-\d{2}|\d{8})')
+
+# Archives up to this size are kept in memory and unzipped from there,
+# skipping the write-then-read round trip through the downloads folder.
+# At most IN_MEMORY_BUFFERS of them are held at once (8 x 128 MiB = 1 GiB);
+# past that, downloads go to disk so GDAL later in the job keeps its memory.
+ZIP_IN_MEMORY_MAX_BYTES = 128 * 1024 * 1024
+IN_MEMORY_BUFFERS = 8
+COPY_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_WORKERS = 16  # Downloads are network-bound; override with FAA_DL_WORKERS or --workers
+UNZIP_WORKERS = 2
+UNZIP_BACKLOG = 4  # Finished downloads allowed to wait for an unzip worker
+MAX_EXTRACT_THREADS = 8  # Per archive; UNZIP_WORKERS archives extract at once
+USER_AGENT = 'FAATileConverter/1.0'
+REQUEST_TIMEOUT = (5, 60)  # (connect, read) seconds, so a stalled socket can't hang a worker
+
+# One pooled session for every faa.gov request so TCP/TLS connections are reused.
+# Rate limiting and transient server errors are retried on the same warm connection pool.
+_SESSION = requests.Session()
+_SESSION.headers.update({'User-Agent': USER_AGENT})
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,  # Everything goes to www.faa.gov
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504))
+))
+
 def load_metadata():
-    """Load chart processing metadata from JSON file. Handles missing or corrupt files gracefully."""
-    if os.path.exists(METADATA_PATH):
-        try:
-            with open(METADATA_PATH, "r") as f:
-                return json.load(f)
-        except Exception as e:
-            logger.warning(f"Failed to load metadata (corrupt?): {e}. Returning empty metadata.")
-            return {}
-    return {}
+    """
+    Load chart processing metadata from JSON file, plus any records journaled by
+    a run that did not reach its final save. Handles missing or corrupt files gracefully.
+    """
+    return load_metadata_file(METADATA_PATH, JOURNAL_PATH)
 
-def save_metadata(data):
-    """Save chart processing metadata to JSON file."""
-    os.makedirs(os.path.dirname(METADATA_PATH), exist_ok=True)
-    with open(METADATA_PATH, "w") as f:
-        json.dump(data, f, indent=2)
+def save_chart_metadata(metadata):
+    """Save metadata (with a .bak of the previous file) and drop the now-redundant journal."""
+    backup_and_save_metadata(metadata, METADATA_PATH)
+    clear_journal(JOURNAL_PATH)
 
 def make_absolute_url(base_url, href):
     """Convert a relative or absolute href to a full URL based on base_url."""
@@ -58,21 +107,78 @@ def make_absolute_url(base_url, href):
         return 'https://www.faa.gov' + href
     return base_url.rstrip('/') + '/' + href
 
-def fetch_vfr_sectional_and_terminal_links(base_url):
-    """Extract VFR Sectional and Terminal Area chart .zip links from the FAA VFR page."""
+def get_index_page(url, cached=None):
+    """
+    GET an FAA index page, conditionally when cached holds an ETag/Last-Modified
+    from a previous run. Returns the response; a 304 means cached['links'] is still valid.
+    """
+    headers = {}
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    resp = _SESSION.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    resp.raise_for_status()
+    return resp
+
+def update_index_cache(cache, key, resp, links):
+    """Remember a page's validators and parsed links so the next run can send a conditional GET."""
+    if cache is None or not links:
+        return
+    etag, last_modified = resp.headers.get('ETag'), resp.headers.get('Last-Modified')
+    if etag or last_modified:
+        cache[key] = {'etag': etag, 'last_modified': last_modified, 'links': links}
+
+# Parsed index pages, so one process fetches each page at most once (see memoized_page)
+_PAGE_MEMO: Dict[str, Any] = {}
+_PAGE_MEMO_LOCKS: Dict[str, threading.Lock] = {}
+_PAGE_MEMO_GUARD = threading.Lock()
+
+def memoized_page(url, fetch):
+    """
+    Return fetch() for url, running it at most once per process. Concurrent callers
+    for the same url wait for the first one instead of fetching in parallel.
+    Empty results (failed fetches) are not memoized.
+    """
+    with _PAGE_MEMO_GUARD:
+        lock = _PAGE_MEMO_LOCKS.setdefault(url, threading.Lock())
+    with lock:
+        if url not in _PAGE_MEMO:
+            result = fetch()
+            if not result:
+                return result
+            _PAGE_MEMO[url] = result
+        return _PAGE_MEMO[url]
+
+def clear_page_memo():
+    """Forget index pages fetched earlier in this process."""
+    _PAGE_MEMO.clear()
+
+def fetch_vfr_sectional_and_terminal_links(base_url, cache=None):
+    """
+    Extract VFR Sectional and Terminal Area chart .zip links from the FAA VFR page.
+    If cache (metadata['_index_cache']) is given, the page is only re-parsed when it changed.
+    """
+    return list(memoized_page(base_url, lambda: _fetch_vfr_links(base_url, cache)))
+
+def _fetch_vfr_links(base_url, cache=None):
+    cached = cache.get(base_url) if cache is not None else None
     try:
-        resp = requests.get(base_url)
-        resp.raise_for_status()
+        resp = get_index_page(base_url, cached)
     except Exception as e:
         logger.error(f"Failed to fetch VFR page: {base_url}: {e}")
         return []
+    if resp.status_code == 304 and cached:
+        logger.info("♻️ VFR page unchanged, using cached links.")
+        return list(cached['links'])
     try:
-        soup = BeautifulSoup(resp.text, 'html.parser')
+        soup = BeautifulSoup(resp.content, HTML_PARSER, parse_only=_VFR_TABS_ONLY)
     except Exception as e:
         logger.error(f"Failed to parse VFR page HTML: {e}")
         return []
     links = []
-    for tab_id in ['sectional', 'terminalArea']:
+    for tab_id in VFR_TAB_IDS:
         tab = soup.find('div', id=tab_id)
         if not tab:
             logger.warning(f"Tab {tab_id} not found in VFR page.")
@@ -81,85 +187,358 @@ def fetch_vfr_sectional_and_terminal_links(base_url):
             href = a_tag['href']
             if href.endswith('.zip'):
                 links.append(make_absolute_url(base_url, href))
+    update_index_cache(cache, base_url, resp, links)
     return links
 
-def fetch_ifr_low_high_links(base_url, allowed_prefixes):
-    """Extract IFR Low/High chart links from FAA IFR page tables, matching allowed prefixes."""
-    import re
+def fetch_ifr_low_high_links(base_url, allowed_prefixes, cache=None):
+    """
+    Extract IFR Low/High chart links from FAA IFR page tables, matching allowed prefixes.
+    The page is fetched and parsed once per process for all prefixes; if cache
+    (metadata['_index_cache']) is given, it is only re-parsed when it changed.
+    """
+    entries = memoized_page(base_url, lambda: _fetch_ifr_entries(base_url, cache))
+    allowed_prefixes = tuple(allowed_prefixes)
+    return [dict(entry) for entry in entries if entry['chart_code'].startswith(allowed_prefixes)]
+
+def _fetch_ifr_entries(base_url, cache=None):
+    cached = cache.get(base_url) if cache is not None else None
     try:
-        resp = requests.get(base_url)
-        resp.raise_for_status()
+        resp = get_index_page(base_url, cached)
     except Exception as e:
         logger.error(f"Failed to fetch IFR page: {base_url}: {e}")
         return []
+    if resp.status_code == 304 and cached:
+        logger.info("♻️ IFR page unchanged, using cached links.")
+        return cached['links']
     try:
-        soup = BeautifulSoup(resp.text, 'html.parser')
+        soup = BeautifulSoup(resp.content, HTML_PARSER, parse_only=_TABLES_ONLY)
     except Exception as e:
         logger.error(f"Failed to parse IFR page HTML: {e}")
         return []
     results = []
-    for table in soup.find_all('table'):
-        for row in table.find_all('tr'):
-            cells = row.find_all('td')
-            if len(cells) < 2:
-                continue
-            chart_code = cells[0].get_text(strip=True)
-            if not any(chart_code.startswith(prefix) for prefix in allowed_prefixes):
-                continue
-            if chart_code.startswith(IFR_SKIP_PREFIXES):
-                continue
-            published_date = None
-            date_match = re.search(r'([A-Z][a-z]{2} \d{1,2} \d{4})', cells[1].get_text())
-            if date_match:
-                try:
-                    published_date = datetime.strptime(date_match.group(1), '%b %d %Y').strftime('%Y-%m-%d')
-                except Exception as e:
-                    logger.warning(f"Failed to parse published date for {chart_code}: {e}")
-                    published_date = None
-            for a_tag in cells[1].find_all('a', href=True):
-                link_text = a_tag.get_text(strip=True).lower()
-                href = a_tag['href']
-                if 'geo-tiff' in link_text and href.endswith('.zip'):
-                    results.append({
-                        'chart_code': chart_code,
-                        'published_date': published_date,
-                        'url': make_absolute_url(base_url, href)
-                    })
+    # select() visits each row once, even in nested tables, in a single pass
+    for row in soup.select('table tr'):
+        cells = row.select('td')
+        if len(cells) < 2:
+            continue
+        chart_code = cells[0].get_text(strip=True)
+        if chart_code.startswith(IFR_SKIP_PREFIXES):
+            continue
+        published_date = None
+        date_match = _DATE_RE.search(cells[1].get_text())
+        if date_match:
+            try:
+                published_date = datetime.strptime(date_match.group(1), '%b %d %Y').strftime('%Y-%m-%d')
+            except Exception as e:
+                logger.warning(f"Failed to parse published date for {chart_code}: {e}")
+                published_date = None
+        for a_tag in cells[1].select('a[href$=".zip"]'):
+            if 'geo-tiff' in a_tag.get_text(strip=True).lower():
+                results.append({
+                    'chart_code': chart_code,
+                    'published_date': published_date,
+                    'url': make_absolute_url(base_url, a_tag['href'])
+                })
+    update_index_cache(cache, base_url, resp, results)
     return results
 
-def download_file(url, dest_folder, retries=3, delay=5):
-    """Download a file from url to dest_folder, returning the local file path. Skips if already exists. Retries on failure."""
-    os.makedirs(dest_folder, exist_ok=True)
-    local_filename = os.path.join(dest_folder, url.split('/')[-1])
-    if os.path.exists(local_filename):
-        logger.info(f"✅ Already exists, skipping download: {os.path.basename(local_filename)}")
+def remote_info_from_headers(headers) -> Dict[str, Any]:
+    """Extract the size/Last-Modified pair used to tell whether a remote zip changed."""
+    size = headers.get('Content-Length')
+    content_range = headers.get('Content-Range')  # "bytes 100-999/1000" on a 206
+    if content_range and '/' in content_range:
+        total = content_range.rpartition('/')[2]
+        size = total if total.isdigit() else None
+    return {'size': int(size) if size else None, 'last_modified': headers.get('Last-Modified')}
+
+def fetch_remote_info(url):
+    """HEAD url and return its remote_info_from_headers(), or None if the request fails."""
+    try:
+        resp = _SESSION.head(url, allow_redirects=True, timeout=REQUEST_TIMEOUT)
+        resp.raise_for_status()
+        return remote_info_from_headers(resp.headers)
+    except Exception as e:
+        logger.warning(f"⚠️ HEAD failed for {url}: {e}")
+        return None
+
+def is_remote_unchanged(record, url) -> bool:
+    """
+    True unless the server now reports a size or Last-Modified that differs from
+    the one recorded at download time. Records without stored values (or a failed
+    HEAD) are trusted as-is.
+    """
+    stored = {k: record.get(k) for k in ('size', 'last_modified') if record.get(k) is not None}
+    if not stored or not url:
+        return True
+    info = fetch_remote_info(url)
+    if info is None:
+        return True
+    return all(info[k] is None or info[k] == v for k, v in stored.items())
+
+def download_file(url, dest_folder, remote_info=None, existing=None):
+    """
+    Download a file from url to dest_folder, returning the local file path.
+    Responses with a Content-Length up to ZIP_IN_MEMORY_MAX_BYTES are returned
+    as an in-memory io.BytesIO instead of being written to disk; responses with
+    no Content-Length are returned as a SpooledTemporaryFile that only spills to
+    disk past that size. Each buffer holds one of IN_MEMORY_BUFFERS slots until
+    it is closed; with no slot free, the file goes to disk as below.
+    Larger files are written to <name>.part; if a run is interrupted, the next
+    one resumes the .part with a Range request guarded by If-Range, so a changed
+    file on the server is fetched again from scratch.
+    If remote_info is a dict, it is filled with the response's size/Last-Modified.
+    If existing (a set of file names already in dest_folder) is given, the folder
+    is assumed to exist and the skip check is an in-memory lookup.
+    Skips if already exists. Connection errors and 429/5xx responses are
+    retried by the session's urllib3 Retry policy.
+    """
+    fname = url.rpartition('/')[2]
+    local_filename = os.path.join(dest_folder, fname)
+    part_filename = local_filename + '.part'
+    validator_filename = part_filename + '.validator'
+    if existing is None:
+        os.makedirs(dest_folder, exist_ok=True)
+        already_there = os.path.exists(local_filename)
+        has_part = os.path.exists(part_filename)
+    else:
+        already_there = fname in existing
+        has_part = fname + '.part' in existing
+    if already_there:
+        logger.info(f"✅ Already exists, skipping download: {fname}")
         return local_filename
-    for attempt in range(1, retries + 1):
+    headers = {}
+    resume_from = 0
+    if has_part:
         try:
-            with requests.get(url, stream=True) as r:
-                r.raise_for_status()
-                with open(local_filename, 'wb') as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-            logger.info(f"⬇️ Downloaded: {os.path.basename(local_filename)}")
-            return local_filename
-        except Exception as e:
-            logger.warning(f"⚠️ Download failed (attempt {attempt}/{retries}) for {url}: {e}")
-            if attempt < retries:
-                time.sleep(delay)
-            else:
-                raise
+            with open(validator_filename) as f:
+                validator = f.read().strip()
+            resume_from = os.path.getsize(part_filename)
+            if validator and resume_from:
+                headers = {'Range': f'bytes={resume_from}-', 'If-Range': validator}
+        except OSError:
+            pass
+    try:
+        with _SESSION.get(url, stream=True, headers=headers, timeout=REQUEST_TIMEOUT) as r:
+            if r.status_code == 416:  # .part is stale or already complete; start over
+                remove_files(part_filename, validator_filename)
+                return download_file(url, dest_folder, remote_info=remote_info)
+            r.raise_for_status()
+            r.raw.decode_content = True
+            if remote_info is not None:
+                remote_info.update(remote_info_from_headers(r.headers))
+            if r.status_code == 206:
+                logger.info(f"⏯️ Resuming {fname} from byte {resume_from}")
+                with open(part_filename, 'ab') as f:
+                    shutil.copyfileobj(r.raw, f, COPY_CHUNK_SIZE)
+                os.replace(part_filename, local_filename)
+                remove_files(validator_filename)
+                logger.info(f"⬇️ Downloaded: {fname}")
+                return local_filename
+            size = int(r.headers.get('Content-Length') or 0)
+            if r.headers.get('Content-Encoding', 'identity') != 'identity':
+                size = 0  # Content-Length is the encoded size, not what r.raw yields
+            if 0 < size <= ZIP_IN_MEMORY_MAX_BYTES and _IN_MEMORY_SLOTS.acquire(blocking=False):
+                buf = _SlotBytesIO()
+                try:
+                    read_into_memory(r.raw, size, buf)
+                except BaseException:
+                    buf.close()
+                    raise
+                remove_files(part_filename, validator_filename)
+                logger.info(f"⬇️ Downloaded (in memory): {fname}")
+                return buf
+            if not size:
+                # Unknown length (chunked): buffer in memory if a slot is free, spilling
+                # to a temp file only if large; otherwise straight to a temp file
+                if _IN_MEMORY_SLOTS.acquire(blocking=False):
+                    buf = _SlotSpooledFile(max_size=ZIP_IN_MEMORY_MAX_BYTES)
+                else:
+                    buf = tempfile.TemporaryFile()
+                try:
+                    shutil.copyfileobj(r.raw, buf, COPY_CHUNK_SIZE)
+                except BaseException:
+                    buf.close()
+                    raise
+                buf.seek(0)
+                remove_files(part_filename, validator_filename)
+                logger.info(f"⬇️ Downloaded (spooled): {fname}")
+                return buf
+            # Write under a .part name so an interrupted body is never mistaken for a
+            # finished zip. The .part's length is the resume offset; preallocate
+            # reserves space without changing it.
+            validator = r.headers.get('ETag') or r.headers.get('Last-Modified')
+            if validator and validator.startswith('W/'):
+                validator = None  # Weak ETags can't be used with If-Range
+            if validator:
+                with open(validator_filename, 'w') as f:
+                    f.write(validator)
+            with open(part_filename, 'wb') as f:
+                preallocate(f, size)
+                shutil.copyfileobj(r.raw, f, COPY_CHUNK_SIZE)
+            os.replace(part_filename, local_filename)
+            remove_files(validator_filename)
+        logger.info(f"⬇️ Downloaded: {fname}")
+        return local_filename
+    except Exception as e:
+        logger.warning(f"⚠️ Download failed for {url}: {e}")
+        raise
+
+# Linux fallocate(2) with FALLOC_FL_KEEP_SIZE reserves disk blocks without
+# changing the file size, which os.posix_fallocate cannot do
+FALLOC_FL_KEEP_SIZE = 0x01
+_fallocate = None
+if sys.platform.startswith('linux'):
+    try:
+        _libc = ctypes.CDLL(None, use_errno=True)
+        _fallocate = getattr(_libc, 'fallocate64', None) or _libc.fallocate
+        _fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+        _fallocate.restype = ctypes.c_int
+    except (OSError, AttributeError):
+        _fallocate = None
+
+# Released when an in-memory download buffer is closed (see _MemorySlot)
+_IN_MEMORY_SLOTS = threading.BoundedSemaphore(IN_MEMORY_BUFFERS)
+
+class _MemorySlot:
+    """Mixin for download buffers: gives back an _IN_MEMORY_SLOTS slot on first close."""
+    def close(self):
+        if not self.closed:
+            _IN_MEMORY_SLOTS.release()
+        super().close()
+
+class _SlotBytesIO(_MemorySlot, io.BytesIO):
+    pass
+
+class _SlotSpooledFile(_MemorySlot, tempfile.SpooledTemporaryFile):
+    pass
+
+def read_into_memory(src, size, buf=None):
+    """
+    Read exactly size bytes from src into a BytesIO (buf, or a new one) whose
+    buffer is allocated once up front, filling it in place through a memoryview
+    instead of growing it chunk by chunk. Raises IOError if src ends early.
+    """
+    if buf is None:
+        buf = io.BytesIO()
+    buf.seek(size - 1)
+    buf.write(b'\0')
+    offset = 0
+    with buf.getbuffer() as view:
+        while offset < size:
+            with view[offset:offset + COPY_CHUNK_SIZE] as chunk:
+                n = src.readinto(chunk)
+            if not n:
+                raise IOError(f"Connection closed after {offset} of {size} bytes")
+            offset += n
+    buf.seek(0)
+    return buf
+
+def preallocate(f, size):
+    """
+    Reserve size bytes for the open file f up front, so a large zip is laid out
+    contiguously and a full disk fails before the download. Uses Linux
+    fallocate(FALLOC_FL_KEEP_SIZE), so the visible file size keeps tracking the
+    bytes written: a .part left by a killed run still gives the right resume
+    offset. No-op where unsupported.
+    """
+    if _fallocate is None:
+        return
+    if _fallocate(f.fileno(), FALLOC_FL_KEEP_SIZE, 0, size) != 0:
+        logger.debug(f"fallocate failed for {f.name}: {os.strerror(ctypes.get_errno())}")
+
+def remove_files(*paths):
+    """Remove files, ignoring any that don't exist."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def prefetch_file(path):
+    """Ask the kernel to start reading a whole file into the page cache (no-op where unsupported)."""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.debug(f"posix_fadvise failed for {path}: {e}")
+
+def copy_stream(src, dst, buf):
+    """Copy src to dst through a caller-owned, reusable buffer instead of a fresh chunk per read."""
+    view = memoryview(buf)
+    while True:
+        n = src.readinto(view)
+        if not n:
+            break
+        dst.write(view[:n])
 
 def unzip_file(zip_path, extract_to):
-    """Unzip a .zip file to the given directory. Removes the zip after extraction."""
-    logger.info(f"\U0001F4E6 Unzipping: {os.path.basename(zip_path)} to {extract_to}")
+    """
+    Unzip a .zip file (a path or a buffer from download_file) to the given
+    directory, extracting members in parallel. Removes the zip file (or closes
+    the buffer) after extraction. Raises on failure, leaving the zip in place for a retry.
+    """
+    name = os.path.basename(zip_path) if isinstance(zip_path, str) else 'in-memory archive'
+    logger.info(f"\U0001F4E6 Unzipping: {name} to {extract_to}")
     os.makedirs(extract_to, exist_ok=True)
+    if isinstance(zip_path, str):
+        prefetch_file(zip_path)
     try:
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_to)
+            # Create dirs up front so worker threads don't race on makedirs
+            # (once per distinct directory, not once per member)
+            root = os.path.abspath(extract_to)
+            made_dirs = {root}
+            targets = []
+            for member in zip_ref.infolist():
+                target = os.path.abspath(os.path.join(root, member.filename))
+                if os.path.commonpath([root, target]) != root:
+                    logger.warning(f"\u26A0\uFE0F Skipping zip member outside {extract_to}: {member.filename}")
+                    continue
+                target_dir = target if member.is_dir() else os.path.dirname(target)
+                if target_dir not in made_dirs:
+                    os.makedirs(target_dir, exist_ok=True)
+                    made_dirs.add(target_dir)
+                if not member.is_dir():
+                    targets.append((member, target))
+            # On-disk zips get one ZipFile (and file descriptor) per worker thread so
+            # reads don't serialize on a shared handle; in-memory buffers share zip_ref.
+            local = threading.local()
+            handles = []
+            def extract_member(job):
+                member, target = job
+                zf = zip_ref
+                if isinstance(zip_path, str):
+                    zf = getattr(local, 'zf', None)
+                    if zf is None:
+                        zf = local.zf = zipfile.ZipFile(zip_path, 'r')
+                        handles.append(zf)
+                buf = getattr(local, 'buf', None)
+                if buf is None:
+                    buf = local.buf = bytearray(COPY_CHUNK_SIZE)
+                with zf.open(member) as src, open(target, 'wb') as dst:
+                    copy_stream(src, dst, buf)
+                mode = (member.external_attr >> 16) & 0o777  # Unix permission bits, if recorded
+                if mode:
+                    os.chmod(target, mode)
+            max_workers = max(1, min(len(targets), MAX_EXTRACT_THREADS, os.cpu_count() or 1))
+            try:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    list(executor.map(extract_member, targets))
+            finally:
+                for zf in handles:
+                    zf.close()
     except Exception as e:
-        logger.error(f"Failed to unzip {zip_path}: {e}")
+        logger.error(f"Failed to unzip {name}: {e}")
+        if not isinstance(zip_path, str):
+            zip_path.close()  # Nothing can retry from a buffer; free it now
+        raise
+    if not isinstance(zip_path, str):
+        zip_path.close()  # Frees the buffer (or deletes a spooled temp file)
         return
     try:
         os.remove(zip_path)
@@ -170,63 +549,146 @@ def unzip_file(zip_path, extract_to):
 def is_vfr_chart_current(metadata, url):
     """Check if a VFR chart (by url) is already current in metadata."""
     fname = os.path.basename(url)
-    return metadata.get('vfr', {}).get(fname) is not None
+    record = metadata.get('vfr', {}).get(fname)
+    return record is not None and is_remote_unchanged(record, url)
 
 def is_ifr_chart_current(metadata, entry, chart_type):
     """Check if an IFR chart (by entry) is already current in metadata."""
     key = f"{entry['chart_code']}_{entry['published_date']}"
-    return metadata.get(chart_type, {}).get(key) is not None
+    record = metadata.get(chart_type, {}).get(key)
+    return record is not None and is_remote_unchanged(record, entry.get('url'))
 
-def process_vfr_charts(metadata: Dict[str, Any], check_current=False) -> Dict[str, Any]:
-    """Download and extract VFR Sectional & Terminal charts with progress bar and parallel downloads. Skips if current if check_current is True."""
-    logger.info("🚩 Starting VFR Sectional & Terminal chart download...")
-    vfr_links = fetch_vfr_sectional_and_terminal_links(VFR_CHARTS_URL)
-    vfr_dir = os.path.join(DOWNLOAD_DIR, 'sectional')
-    os.makedirs(vfr_dir, exist_ok=True)
-    to_download = []
-    for url in vfr_links:
-        if check_current and is_vfr_chart_current(metadata, url):
+def current_flags(is_current, items, check_current, workers=None) -> List[bool]:
+    """Evaluate is_current for every item on workers threads (each check may HEAD the server)."""
+    if not check_current:
+        return [False] * len(items)
+    with ThreadPoolExecutor(max_workers=workers or DOWNLOAD_WORKERS) as executor:
+        return list(executor.map(is_current, items))
+
+def collect_vfr_jobs(metadata: Dict[str, Any], check_current=False, workers=None) -> List[Tuple[str, Any]]:
+    """Return ('sectional', url) download jobs for VFR Sectional & Terminal charts. Skips if current if check_current is True."""
+    vfr_links = fetch_vfr_sectional_and_terminal_links(VFR_CHARTS_URL, cache=metadata.setdefault('_index_cache', {}))
+    os.makedirs(os.path.join(DOWNLOAD_DIR, 'sectional'), exist_ok=True)
+    jobs = []
+    current = current_flags(lambda url: is_vfr_chart_current(metadata, url), vfr_links, check_current, workers)
+    for url, is_current in zip(vfr_links, current):
+        if is_current:
             logger.info(f"⏩ Skipping current VFR chart: {os.path.basename(url)}")
             continue
-        to_download.append(url)
-    max_workers = min(4, os.cpu_count() or 1)
-    def vfr_task(url):
-        success, err = download_and_extract_single_vfr(url, metadata)
-        fname = os.path.basename(url)
-        if not success:
-            logger.error(f"❌ [VFR] Failed: {fname}: {err}")
-        return success
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        list(tqdm(executor.map(vfr_task, to_download), total=len(to_download), desc="VFR Charts", unit="file"))
-    backup_and_save_metadata(metadata, METADATA_PATH)
+        jobs.append(('sectional', url))
+    return jobs
+
+def collect_ifr_jobs(metadata: Dict[str, Any], chart_type: str, allowed_prefixes, check_current=False, workers=None) -> List[Tuple[str, Any]]:
+    """Return (chart_type, entry) download jobs for IFR Low or High charts. Skips if current if check_current is True."""
+    links = fetch_ifr_low_high_links(IFR_CHARTS_URL, allowed_prefixes, cache=metadata.setdefault('_index_cache', {}))
+    os.makedirs(os.path.join(DOWNLOAD_DIR, chart_type), exist_ok=True)
+    jobs = []
+    current = current_flags(lambda entry: is_ifr_chart_current(metadata, entry, chart_type), links, check_current, workers)
+    for entry, is_current in zip(links, current):
+        if is_current:
+            logger.info(f"⏩ Skipping current {chart_type} chart: {entry['chart_code']}_{entry['published_date']}")
+            continue
+        jobs.append((chart_type, entry))
+    return jobs
+
+def chart_job_target(chart_type: str, item) -> Tuple[str, str, str, str, str]:
+    """Return (url, download_dir, extract_path, label, name) for a (chart_type, url_or_entry) job."""
+    if chart_type == 'sectional':
+        vfr_dir = os.path.join(DOWNLOAD_DIR, 'sectional')
+        fname = os.path.basename(item)
+        return item, vfr_dir, os.path.join(vfr_dir, fname.replace('.zip', '')), 'VFR', fname
+    out_dir = os.path.join(DOWNLOAD_DIR, chart_type)
+    key = f"{item['chart_code']}_{item['published_date']}"
+    return item['url'], out_dir, os.path.join(out_dir, key), chart_type.upper(), key
+
+def record_chart(metadata: Dict[str, Any], chart_type: str, item, remote_info=None) -> None:
+    """
+    Mark a downloaded and extracted chart as done in metadata, keeping the
+    remote size/Last-Modified (if known) for the next run's current-check.
+    The record is also journaled so it survives a crash before the batch save.
+    """
+    record = {
+        'downloaded': True,
+        'timestamp': datetime.now(timezone.utc).isoformat()
+    }
+    if chart_type == 'sectional':
+        key, section = os.path.basename(item), 'vfr'
+    else:
+        key, section = f"{item['chart_code']}_{item['published_date']}", chart_type
+        record['published_date'] = item['published_date']
+    if remote_info:
+        record.update(remote_info)
+    metadata.setdefault(section, {})[key] = record
+    append_journal(JOURNAL_PATH, section, key, record)
+
+def process_chart_jobs(jobs: List[Tuple[str, Any]], metadata: Dict[str, Any], desc="Charts", workers=None) -> Dict[str, Any]:
+    """
+    Download and extract (chart_type, url_or_entry) jobs from any mix of chart
+    types, with a progress bar. Downloads share the pooled _SESSION and run in
+    one thread pool; each finished zip is handed to a separate unzip pool so
+    extraction overlaps the downloads still in flight. At most UNZIP_BACKLOG
+    finished zips wait for extraction; past that, download threads block.
+    Archives held in memory are capped separately at IN_MEMORY_BUFFERS x
+    ZIP_IN_MEMORY_MAX_BYTES (1 GiB) by download_file, whatever the worker
+    count; the rest wait on disk. A chart is recorded in metadata only after
+    its unzip succeeds.
+    """
+    progress = tqdm(total=len(jobs), desc=desc, unit="file")
+    # List each download folder once instead of stat-ing it per chart
+    existing = {}
+    for job in jobs:
+        download_dir = chart_job_target(*job)[1]
+        if download_dir not in existing:
+            os.makedirs(download_dir, exist_ok=True)
+            existing[download_dir] = set(os.listdir(download_dir))
+
+    def finish(job, err=None, remote_info=None):
+        if err is None:
+            record_chart(metadata, *job, remote_info=remote_info)
+        else:
+            _, _, _, label, name = chart_job_target(*job)
+            logger.error(f"❌ [{label}] Failed: {name}: {err}")
+        progress.update(1)
+
+    backlog = threading.BoundedSemaphore(UNZIP_WORKERS + UNZIP_BACKLOG)
+
+    def on_unzipped(job, future, remote_info):
+        backlog.release()
+        finish(job, future.exception(), remote_info)
+
+    def download_task(job):
+        url, download_dir, extract_path, _, _ = chart_job_target(*job)
+        remote_info = {}
+        try:
+            zip_path = download_file(url, download_dir, remote_info=remote_info, existing=existing[download_dir])
+        except Exception as e:
+            finish(job, e)
+            return
+        backlog.acquire()
+        future = unzip_pool.submit(unzip_file, zip_path, extract_path)
+        future.add_done_callback(lambda f: on_unzipped(job, f, remote_info))
+
+    with ThreadPoolExecutor(max_workers=UNZIP_WORKERS) as unzip_pool:
+        with ThreadPoolExecutor(max_workers=workers or DOWNLOAD_WORKERS) as download_pool:
+            list(download_pool.map(download_task, jobs))
+    progress.close()
+    save_chart_metadata(metadata)
     return metadata
 
-def process_ifr_charts(metadata: Dict[str, Any], chart_type: str, allowed_prefixes, check_current=False) -> Dict[str, Any]:
+def process_vfr_charts(metadata: Dict[str, Any], check_current=False, workers=None) -> Dict[str, Any]:
+    """Download and extract VFR Sectional & Terminal charts with progress bar and parallel downloads. Skips if current if check_current is True."""
+    logger.info("🚩 Starting VFR Sectional & Terminal chart download...")
+    jobs = collect_vfr_jobs(metadata, check_current=check_current, workers=workers)
+    return process_chart_jobs(jobs, metadata, desc="VFR Charts", workers=workers)
+
+def process_ifr_charts(metadata: Dict[str, Any], chart_type: str, allowed_prefixes, check_current=False, workers=None) -> Dict[str, Any]:
     """
     Download and extract IFR Low or High charts with progress bar and parallel downloads.
     Skips if current if check_current is True.
     """
     logger.info(f"🚩 Starting {chart_type.upper()} chart download...")
-    links = fetch_ifr_low_high_links(IFR_CHARTS_URL, allowed_prefixes)
-    out_dir = os.path.join(DOWNLOAD_DIR, chart_type)
-    os.makedirs(out_dir, exist_ok=True)
-    to_download = []
-    for entry in links:
-        if check_current and is_ifr_chart_current(metadata, entry, chart_type):
-            logger.info(f"⏩ Skipping current {chart_type} chart: {entry['chart_code']}_{entry['published_date']}")
-            continue
-        to_download.append(entry)
-    max_workers = min(4, os.cpu_count() or 1)
-    def ifr_task(entry):
-        success, err = download_and_extract_single_ifr(entry, chart_type, metadata)
-        key = f"{entry['chart_code']}_{entry['published_date']}"
-        if not success:
-            logger.error(f"❌ [{chart_type.upper()}] Failed: {key}: {err}")
-        return success
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        list(tqdm(executor.map(ifr_task, to_download), total=len(to_download), desc=f"{chart_type.upper()} Charts", unit="file"))
-    backup_and_save_metadata(metadata, METADATA_PATH)
-    return metadata
+    jobs = collect_ifr_jobs(metadata, chart_type, allowed_prefixes, check_current=check_current, workers=workers)
+    return process_chart_jobs(jobs, metadata, desc=f"{chart_type.upper()} Charts", workers=workers)
 
 def print_summary(metadata):
     """Print a summary of processed charts."""
@@ -242,8 +704,15 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Download and extract FAA charts.")
     parser.add_argument('--chart-type', type=str, default=None, choices=['sectional', 'ifr_low', 'ifr_high'], help='Only process this chart type (for matrix jobs)')
     parser.add_argument('--check-current', action='store_true', help='Skip download if chart is already current')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore cached FAA index pages and fetch them in full')
+    parser.add_argument('--workers', type=int, default=None, help=f'Number of parallel downloads (default: {DOWNLOAD_WORKERS})')
     return parser.parse_args()
 
+def get_workers_from_env_or_args(args: argparse.Namespace) -> int:
+    """Get number of parallel downloads from --workers or env FAA_DL_WORKERS, default DOWNLOAD_WORKERS."""
+    workers = args.workers or os.environ.get("FAA_DL_WORKERS")
+    return int(workers) if workers else DOWNLOAD_WORKERS
+
 def main():
     """
     Orchestrate the download and extraction workflow for all chart types or a single chart type.
@@ -252,47 +721,52 @@ def main():
     metadata = load_metadata()
     os.makedirs(DOWNLOAD_DIR, exist_ok=True)
     check_current = getattr(args, 'check_current', False)
-    if args.chart_type:
-        if args.chart_type == 'sectional':
-            metadata = process_vfr_charts(metadata, check_current=check_current)
-        elif args.chart_type == 'ifr_low':
-            metadata = process_ifr_charts(metadata, 'ifr_low', IFR_LOW_PREFIXES, check_current=check_current)
-        elif args.chart_type == 'ifr_high':
-            metadata = process_ifr_charts(metadata, 'ifr_high', IFR_HIGH_PREFIXES, check_current=check_current)
-    else:
-        metadata = process_vfr_charts(metadata, check_current=check_current)
-        metadata = process_ifr_charts(metadata, 'ifr_low', IFR_LOW_PREFIXES, check_current=check_current)
-        metadata = process_ifr_charts(metadata, 'ifr_high', IFR_HIGH_PREFIXES, check_current=check_current)
+    workers = get_workers_from_env_or_args(args)
+    if args.no_cache:
+        clear_page_memo()
+        metadata.pop('_index_cache', None)
+    with _SESSION:  # Close pooled connections once all downloads are done
+        if args.chart_type:
+            if args.chart_type == 'sectional':
+                metadata = process_vfr_charts(metadata, check_current=check_current, workers=workers)
+            elif args.chart_type == 'ifr_low':
+                metadata = process_ifr_charts(metadata, 'ifr_low', IFR_LOW_PREFIXES, check_current=check_current, workers=workers)
+            elif args.chart_type == 'ifr_high':
+                metadata = process_ifr_charts(metadata, 'ifr_high', IFR_HIGH_PREFIXES, check_current=check_current, workers=workers)
+        else:
+            # Fan out all chart types through one pool instead of three serial batches
+            logger.info("🚩 Starting download of all chart types...")
+            # The index pages are fetched concurrently; downloads start once all are parsed
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                collectors = [
+                    executor.submit(collect_vfr_jobs, metadata, check_current=check_current, workers=workers),
+                    executor.submit(collect_ifr_jobs, metadata, 'ifr_low', IFR_LOW_PREFIXES, check_current=check_current, workers=workers),
+                    executor.submit(collect_ifr_jobs, metadata, 'ifr_high', IFR_HIGH_PREFIXES, check_current=check_current, workers=workers),
+                ]
+                jobs = [job for future in collectors for job in future.result()]
+            metadata = process_chart_jobs(jobs, metadata, workers=workers)
     print_summary(metadata)
 
 def download_and_extract_single_vfr(url, metadata=None):
-    """Download and extract a single VFR chart zip file."""
-    vfr_dir = os.path.join(DOWNLOAD_DIR, 'sectional')
-    fname = os.path.basename(url)
-    extract_path = os.path.join(vfr_dir, fname.replace('.zip', ''))
+    """
+    Download and extract a single VFR chart zip file. Success is recorded in
+    metadata and journaled; call save_chart_metadata once the batch is done.
+    """
+    _, vfr_dir, extract_path, _, _ = chart_job_target('sectional', url)
     success, err = download_and_extract_zip(url, vfr_dir, extract_path, download_file, unzip_file)
     if metadata is not None and success:
-        metadata.setdefault('vfr', {})[fname] = {
-            'downloaded': True,
-            'timestamp': datetime.now(timezone.utc).isoformat()
-        }
-        backup_and_save_metadata(metadata, METADATA_PATH)
+        record_chart(metadata, 'sectional', url)
     return success, err
 
 def download_and_extract_single_ifr(entry, chart_type, metadata=None):
-    """Download and extract a single IFR chart zip file (entry from fetch_ifr_low_high_links)."""
-    out_dir = os.path.join(DOWNLOAD_DIR, chart_type)
-    key = f"{entry['chart_code']}_{entry['published_date']}"
-    fname = os.path.basename(entry['url'])
-    extract_path = os.path.join(out_dir, key)
-    success, err = download_and_extract_zip(entry['url'], out_dir, extract_path, download_file, unzip_file)
+    """
+    Download and extract a single IFR chart zip file (entry from fetch_ifr_low_high_links).
+    Success is recorded in metadata and journaled; call save_chart_metadata once the batch is done.
+    """
+    url, out_dir, extract_path, _, _ = chart_job_target(chart_type, entry)
+    success, err = download_and_extract_zip(url, out_dir, extract_path, download_file, unzip_file)
     if metadata is not None and success:
-        metadata.setdefault(chart_type, {})[key] = {
-            'downloaded': True,
-            'published_date': entry['published_date'],
-            'timestamp': datetime.now(timezone.utc).isoformat()
-        }
-        backup_and_save_metadata(metadata, METADATA_PATH)
+        record_chart(metadata, chart_type, entry)
     return success, err
 
 def get_first_vfr_url():
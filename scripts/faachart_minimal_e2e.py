@@ -1,7 +1,7 @@
 import sys
 from scripts.download_faa_charts import (
-    get_first_vfr_url, get_first_ifr_entry, download_and_extract_single_vfr, download_and_extract_single_ifr, load_metadata,
-    fetch_vfr_sectional_and_terminal_links, fetch_ifr_low_high_links, IFR_LOW_PREFIXES, IFR_HIGH_PREFIXES
+    get_first_vfr_url, get_first_ifr_entry, download_and_extract_single_vfr, download_and_extract_single_ifr, load_metadata, save_chart_metadata,
+    fetch_vfr_sectional_and_terminal_links, fetch_ifr_low_high_links, IFR_LOW_PREFIXES, IFR_HIGH_PREFIXES, URL_DATE_RE
 )
 
 if __name__ == "__main__":
@@ -22,8 +22,7 @@ if __name__ == "__main__":
             print(f"No VFR url found for code {chart_code}")
             sys.exit(1)
         # Try to extract date from filename (e.g., .../SEA_20250711.zip)
-        import re
-        m = re.search(r'(\d{4}-\d{2}-\d{2}|\d{8})', url)
+        m = URL_DATE_RE.search(url)
         if m:
             chart_date = m.group(1)
         print(f"⬇️ Downloading: {url}")
@@ -50,4 +49,5 @@ if __name__ == "__main__":
     else:
         print(f"Unknown chart type: {chart_type}")
         sys.exit(1)
+    save_chart_metadata(metadata)
     print(f"🎉 Download and extraction complete. Chart date: {chart_date}")
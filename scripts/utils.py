@@ -1,35 +1,151 @@
 import os
+import json
 import shutil
 import zipfile
 import logging
-from typing import Tuple
+from typing import Any, Tuple
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
 
-def download_and_extract_zip(url: str, dest_folder: str, extract_to: str, download_file_func, unzip_file_func, retries: int = 3, delay: int = 5) -> Tuple[bool, str]:
+# orjson is optional; it serializes/parses metadata several times faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# python-isal's zlib is a drop-in, SIMD-accelerated replacement; zipfile looks
+# zlib up at call time, so patching it here speeds up DEFLATE for every zip
+# extracted by a script that imports utils.
+try:
+    from isal import isal_zlib
+    zipfile.zlib = isal_zlib
+except ImportError:
+    pass
+
+def download_and_extract_zip(url: str, dest_folder: str, extract_to: str, download_file_func, unzip_file_func) -> Tuple[bool, str]:
     """
     Download a zip file and extract it. Returns (success, error_message_or_None).
     download_file_func and unzip_file_func are injected for testability.
     """
     try:
-        zip_path = download_file_func(url, dest_folder, retries, delay)
+        zip_path = download_file_func(url, dest_folder)
         try:
             unzip_file_func(zip_path, extract_to)
         except Exception as e:
-            logging.error(f"Unzip failed: {zip_path}: {e}")
+            logging.error(f"Unzip failed: {url}: {e}")
             # Keep zip for retry
             return False, f"Unzip failed: {e}"
+        finally:
+            # Small downloads come back as an in-memory buffer; release it even on failure
+            if hasattr(zip_path, 'close'):
+                zip_path.close()
         return True, None
     except Exception as e:
         return False, str(e)
 
 
+def dumps_json(data: Any) -> bytes:
+    """Serialize data to indented JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2).encode()
+
+
+def loads_json(raw) -> Any:
+    """Parse JSON from bytes or str, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def fold_journal(metadata: dict, journal_path) -> dict:
+    """
+    Fold records journaled by a run that did not reach its final save into
+    metadata. Lines are {"section", "key", "record"} objects; a torn last line
+    or any other malformed line is logged and skipped.
+    """
+    if not os.path.exists(journal_path):
+        return metadata
+    with open(journal_path, 'rb') as f:
+        for lineno, line in enumerate(f, 1):
+            try:
+                entry = loads_json(line)
+                metadata.setdefault(entry['section'], {})[entry['key']] = entry['record']
+            except (ValueError, KeyError, TypeError) as e:
+                # Torn last line from an interrupted write, or a line of the wrong shape
+                logging.warning(f"⚠️ Skipping malformed journal line {lineno} in {journal_path}: {e!r}")
+    return metadata
+
+
+def load_metadata_file(path, journal_path) -> dict:
+    """
+    Load metadata from path, then fold in records from journal_path. A missing,
+    corrupt or unreadable file or journal is logged and treated as empty, so a
+    bad log never stops a run.
+    """
+    metadata = {}
+    if os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                metadata = loads_json(f.read())
+            if not isinstance(metadata, dict):
+                raise ValueError(f"expected an object, got {type(metadata).__name__}")
+        except Exception as e:
+            logging.warning(f"⚠️ Failed to load metadata {path} (corrupt?): {e}. Returning empty metadata.")
+            metadata = {}
+    try:
+        fold_journal(metadata, journal_path)
+    except Exception as e:
+        logging.warning(f"⚠️ Failed to read metadata journal {journal_path}: {e}")
+    return metadata
+
+
+def append_journal(journal_path, section: str, key: str, record: dict) -> None:
+    """
+    Append one completed-file record to journal_path as a single small O_APPEND
+    write, so per-file progress costs O(1) instead of rewriting the metadata file.
+    """
+    line = (json.dumps({'section': section, 'key': key, 'record': record}) + '\n').encode()
+    fd = os.open(journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            # Serialize appends from concurrent runs sharing the same journal
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def clear_journal(journal_path) -> None:
+    """Remove journal_path once its records are part of the saved metadata."""
+    try:
+        os.remove(journal_path)
+    except FileNotFoundError:
+        pass
+
+
 def backup_and_save_metadata(metadata: dict, path) -> None:
     """
     Backup the existing metadata file and atomically save the new metadata.
     """
     if os.path.exists(path):
-        shutil.copy(str(path), str(path) + '.bak')
+        # os.replace below gives path a new inode, so a hardlink preserves the
+        # old contents without copying them. Fall back to a copy across devices.
+        bak_path = str(path) + '.bak'
+        try:
+            os.unlink(bak_path)
+        except FileNotFoundError:
+            pass
+        try:
+            os.link(path, bak_path)
+        except OSError:
+            shutil.copy(str(path), bak_path)
     tmp_path = str(path) + '.tmp'
-    with open(tmp_path, 'w') as f:
-        import json
-        json.dump(metadata, f, indent=2)
+    with open(tmp_path, 'wb') as f:
+        f.write(dumps_json(metadata))
+        # Make the new contents durable before the rename makes them visible
+        f.flush()
+        os.fsync(f.fileno())
     os.replace(tmp_path, path)
@@ -8,18 +8,25 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 class EmojiTestResult(unittest.TextTestResult):
+    """Collects one ✓/x line per test and writes them all at the end of the run."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        use_color = self.stream.isatty()
+        self._ok = "\033[92m✓\033[0m" if use_color else "✓"
+        self._bad = "\033[91mx\033[0m" if use_color else "x"
+        self._lines = []
     def addSuccess(self, test):
         super().addSuccess(test)
-        self.stream.write(f"\033[92m✓\033[0m {test}\n")
-        self.stream.flush()
+        self._lines.append(f"{self._ok} {test}\n")
     def addFailure(self, test, err):
         super().addFailure(test, err)
-        self.stream.write(f"\033[91mx\033[0m {test}\n")
-        self.stream.flush()
+        self._lines.append(f"{self._bad} {test}\n")
     def addError(self, test, err):
         super().addError(test, err)
-        self.stream.write(f"\033[91mx\033[0m {test}\n")
-        self.stream.flush()
+        self._lines.append(f"{self._bad} {test}\n")
+    def stopTestRun(self):
+        self.stream.write(''.join(self._lines))
+        super().stopTestRun()
 
 def main():
     loader = unittest.TestLoader()
@@ -0,0 +1,48 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+from scripts.check_s3_cache_control import get_sample_tile_path, get_sample_tile_paths, check_s3_cache_control_tiles, EXPECTED_CACHE_CONTROL
+
+class TestSampleTilePath(unittest.TestCase):
+    def test_finds_nested_png(self):
+        print("Test: get_sample_tile_path finds a nested PNG...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tile_dir = os.path.join(tmpdir, '5', '10')
+            os.makedirs(tile_dir)
+            open(os.path.join(tmpdir, 'tilemapresource.xml'), 'w').close()
+            png_path = os.path.join(tile_dir, '12.png')
+            open(png_path, 'w').close()
+            found = get_sample_tile_path(tmpdir)
+            print(f"  found: {found}")
+            self.assertEqual(found, png_path)
+
+    def test_no_png(self):
+        print("Test: get_sample_tile_path with no PNG...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            open(os.path.join(tmpdir, 'leaflet.html'), 'w').close()
+            self.assertIsNone(get_sample_tile_path(tmpdir))
+
+    def test_sample_limit(self):
+        print("Test: get_sample_tile_paths stops at the limit...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for x in range(5):
+                open(os.path.join(tmpdir, f'{x}.png'), 'w').close()
+            self.assertEqual(len(get_sample_tile_paths(tmpdir, 3)), 3)
+            self.assertEqual(len(get_sample_tile_paths(tmpdir, 10)), 5)
+
+class TestCacheControlTiles(unittest.TestCase):
+    @mock.patch('scripts.check_s3_cache_control.check_s3_cache_control_many')
+    def test_exit_codes(self, mock_many):
+        print("Test: check_s3_cache_control_tiles exit codes...")
+        paths = ['/tiles/5/1/1.png', '/tiles/5/1/2.png']
+        ok = {'CacheControl': EXPECTED_CACHE_CONTROL}
+        mock_many.return_value = {'charts/5/1/1.png': ok, 'charts/5/1/2.png': ok}
+        self.assertEqual(check_s3_cache_control_tiles('bucket', 'charts', paths, '/tiles'), 0)
+        mock_many.return_value = {'charts/5/1/1.png': ok, 'charts/5/1/2.png': None}
+        self.assertEqual(check_s3_cache_control_tiles('bucket', 'charts', paths, '/tiles'), 4)
+        mock_many.return_value = {'charts/5/1/1.png': {'CacheControl': 'no-cache'}, 'charts/5/1/2.png': None}
+        self.assertEqual(check_s3_cache_control_tiles('bucket', 'charts', paths, '/tiles'), 3)
+
+if __name__ == "__main__":
+    unittest.main()
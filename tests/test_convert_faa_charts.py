@@ -0,0 +1,160 @@
+import unittest
+import os
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+from scripts.convert_faa_charts import find_tiff_files, is_paletted_tiff, load_metadata, append_journal, tiles_exist, convert_tiff, load_palette_cache, save_palette_cache
+
+class TestFindTiffFiles(unittest.TestCase):
+    def test_find_tiff_files_recursive(self):
+        print("Test: find_tiff_files finds .tif/.tiff recursively...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            nested = os.path.join(tmpdir, 'SEA_20250711', 'extra')
+            os.makedirs(nested)
+            expected = [
+                os.path.join(tmpdir, 'SEA_20250711', 'Seattle SEC.tif'),
+                os.path.join(nested, 'inset.TIFF'),
+            ]
+            for path in expected:
+                open(path, 'w').close()
+            open(os.path.join(tmpdir, 'SEA_20250711', 'Seattle SEC.htm'), 'w').close()
+            found = find_tiff_files(tmpdir)
+            print(f"  found: {found}")
+            self.assertEqual(sorted(found), sorted(expected))
+
+    def test_find_tiff_files_prunes_tiles_and_hidden_dirs(self):
+        print("Test: find_tiff_files skips *_tiles and hidden dirs...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for sub in ('Seattle_SEC_tiles', '.cache'):
+                os.makedirs(os.path.join(tmpdir, sub))
+                open(os.path.join(tmpdir, sub, 'stray.tif'), 'w').close()
+            chart = os.path.join(tmpdir, 'Seattle SEC.tif')
+            open(chart, 'w').close()
+            self.assertEqual(find_tiff_files(tmpdir), [chart])
+
+    def test_find_tiff_files_missing_dir(self):
+        print("Test: find_tiff_files with missing directory...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.assertEqual(find_tiff_files(os.path.join(tmpdir, 'missing')), [])
+
+class TestPaletteCache(unittest.TestCase):
+    @mock.patch('scripts.convert_faa_charts.gdal', None)
+    @mock.patch('scripts.convert_faa_charts._find_tool', lambda name: name)
+    @mock.patch('scripts.convert_faa_charts.subprocess.run')
+    def test_palette_cache_reused_until_file_changes(self, mock_run):
+        print("Test: is_paletted_tiff reuses cached result for unchanged file...")
+        mock_run.return_value = mock.Mock(stdout='Band 1 Block=256x256 Type=Byte, ColorInterp=Palette')
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tiff_path = os.path.join(tmpdir, 'chart.tif')
+            with open(tiff_path, 'wb') as f:
+                f.write(b'II*')
+            cache = {}
+            self.assertTrue(is_paletted_tiff(tiff_path, cache))
+            self.assertTrue(is_paletted_tiff(tiff_path, cache))
+            self.assertEqual(mock_run.call_count, 1)
+            with open(tiff_path, 'ab') as f:
+                f.write(b'\x00')
+            self.assertTrue(is_paletted_tiff(tiff_path, cache))
+            print(f"  gdalinfo calls: {mock_run.call_count}")
+            self.assertEqual(mock_run.call_count, 2)
+
+    @mock.patch('scripts.convert_faa_charts.gdal', None)
+    @mock.patch('scripts.convert_faa_charts._find_tool', lambda name: name)
+    @mock.patch('scripts.convert_faa_charts.subprocess.run')
+    def test_palette_cache_round_trips_by_relative_path(self, mock_run):
+        print("Test: palette cache is saved by relative path and reloaded...")
+        mock_run.return_value = mock.Mock(stdout='ColorInterp=Palette')
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.makedirs(os.path.join(tmpdir, 'SEA_20250711'))
+            tiff_path = os.path.join(tmpdir, 'SEA_20250711', 'Seattle SEC.tif')
+            with open(tiff_path, 'wb') as f:
+                f.write(b'II*')
+            cache = {}
+            self.assertTrue(is_paletted_tiff(tiff_path, cache))
+            save_palette_cache(tmpdir, cache)
+            with open(os.path.join(tmpdir, '.palette_cache.json')) as f:
+                on_disk = json.load(f)
+            print(f"  cache: {on_disk}")
+            self.assertEqual(list(on_disk), [os.path.join('SEA_20250711', 'Seattle SEC.tif')])
+            loaded = load_palette_cache(tmpdir, [tiff_path])
+            self.assertTrue(is_paletted_tiff(tiff_path, loaded))
+            self.assertEqual(mock_run.call_count, 1)
+            self.assertEqual(load_palette_cache(tmpdir, []), {})
+            self.assertEqual(load_palette_cache(tmpdir), loaded)
+
+class TestExistingTiles(unittest.TestCase):
+    def test_tiles_exist(self):
+        print("Test: tiles_exist detects a finished pyramid...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.assertFalse(tiles_exist(tmpdir, '5-12'))
+            os.makedirs(os.path.join(tmpdir, '12', '600'))
+            self.assertFalse(tiles_exist(tmpdir, '5-12'))
+            os.makedirs(os.path.join(tmpdir, '5', '4'))
+            self.assertTrue(tiles_exist(tmpdir, '5-12'))
+            print("  widened zoom range is not treated as finished")
+            self.assertFalse(tiles_exist(tmpdir, '5-13'))
+            self.assertTrue(tiles_exist(tmpdir, '5'))
+
+    @mock.patch('scripts.convert_faa_charts.run_gdal2tiles')
+    @mock.patch('scripts.convert_faa_charts.is_paletted_tiff')
+    def test_convert_tiff_skips_existing_tiles(self, mock_paletted, mock_gdal2tiles):
+        print("Test: convert_tiff skips gdal2tiles when tiles exist...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tiff_path = os.path.join(tmpdir, 'Seattle SEC.tif')
+            os.makedirs(os.path.join(tmpdir, 'Seattle_SEC_tiles', '12', '600'))
+            os.makedirs(os.path.join(tmpdir, 'Seattle_SEC_tiles', '5', '4'))
+            file_name, metadata_update, success = convert_tiff(tiff_path, '5-12')
+            self.assertTrue(success)
+            self.assertTrue(metadata_update['existing_tiles'])
+            mock_paletted.assert_not_called()
+            mock_gdal2tiles.assert_not_called()
+
+class TestMetadataJournal(unittest.TestCase):
+    def test_journal_folded_into_metadata(self):
+        print("Test: load_metadata folds journaled records into the snapshot...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            metadata_path = Path(tmpdir) / 'faa_chart_log.json'
+            journal_path = Path(tmpdir) / 'faa_chart_log.ndjson'
+            with open(metadata_path, 'w') as f:
+                json.dump({'converted': {'a.tif': {'converted': True}}}, f)
+            with mock.patch('scripts.convert_faa_charts.METADATA_PATH', metadata_path), \
+                 mock.patch('scripts.convert_faa_charts.JOURNAL_PATH', journal_path):
+                append_journal(journal_path, 'converted', 'b.tif', {'converted': True})
+                with open(journal_path, 'a') as f:
+                    f.write('{"section": "conv')  # torn write from a crash
+                loaded = load_metadata()
+            print(f"  loaded: {loaded}")
+            self.assertEqual(sorted(loaded['converted']), ['a.tif', 'b.tif'])
+
+    def test_malformed_journal_lines_skipped(self):
+        print("Test: load_metadata skips journal lines that parse but have the wrong shape...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            metadata_path = Path(tmpdir) / 'faa_chart_log.json'
+            journal_path = Path(tmpdir) / 'faa_chart_log.ndjson'
+            with open(journal_path, 'w') as f:
+                f.write('[1, 2]\n')
+                f.write('{"section": "converted"}\n')
+                f.write('"just a string"\n')
+            append_journal(journal_path, 'converted', 'b.tif', {'converted': True})
+            with mock.patch('scripts.convert_faa_charts.METADATA_PATH', metadata_path), \
+                 mock.patch('scripts.convert_faa_charts.JOURNAL_PATH', journal_path):
+                loaded = load_metadata()
+            print(f"  loaded: {loaded}")
+            self.assertEqual(loaded, {'converted': {'b.tif': {'converted': True}}})
+
+    def test_corrupt_metadata_starts_empty(self):
+        print("Test: load_metadata tolerates a corrupt metadata file...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            metadata_path = Path(tmpdir) / 'faa_chart_log.json'
+            journal_path = Path(tmpdir) / 'faa_chart_log.ndjson'
+            metadata_path.write_text('{"converted": ')
+            with mock.patch('scripts.convert_faa_charts.METADATA_PATH', metadata_path), \
+                 mock.patch('scripts.convert_faa_charts.JOURNAL_PATH', journal_path):
+                append_journal(journal_path, 'converted', 'b.tif', {'converted': True})
+                loaded = load_metadata()
+            print(f"  loaded: {loaded}")
+            self.assertEqual(loaded, {'converted': {'b.tif': {'converted': True}}})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+from unittest import mock
 from scripts.download_faa_charts import is_vfr_chart_current, is_ifr_chart_current
 
 class TestCurrentCheck(unittest.TestCase):
@@ -12,5 +13,14 @@ class TestCurrentCheck(unittest.TestCase):
         entry = {'chart_code': 'ELUS01', 'published_date': '2025-07-15'}
         self.assertTrue(is_ifr_chart_current(metadata, entry, 'ifr_low'))
 
+    @mock.patch('scripts.download_faa_charts.fetch_remote_info')
+    def test_vfr_chart_changed_on_server(self, mock_info):
+        metadata = {'vfr': {'chart1.zip': {'downloaded': True, 'size': 100, 'last_modified': 'Thu, 10 Jul 2025 00:00:00 GMT'}}}
+        url = 'http://example.com/chart1.zip'
+        mock_info.return_value = {'size': 100, 'last_modified': 'Thu, 10 Jul 2025 00:00:00 GMT'}
+        self.assertTrue(is_vfr_chart_current(metadata, url))
+        mock_info.return_value = {'size': 120, 'last_modified': 'Thu, 04 Sep 2025 00:00:00 GMT'}
+        self.assertFalse(is_vfr_chart_current(metadata, url))
+
 if __name__ == "__main__":
     unittest.main()
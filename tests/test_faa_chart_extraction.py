@@ -1,10 +1,12 @@
+import os
 import unittest
 from scripts.download_faa_charts import (
     VFR_CHARTS_URL, IFR_CHARTS_URL,
-    IFR_LOW_PREFIXES, IFR_HIGH_PREFIXES,
+    IFR_ALL_PREFIXES,
     fetch_vfr_sectional_and_terminal_links, fetch_ifr_low_high_links
 )
 
+@unittest.skipUnless(os.getenv('FAA_LIVE_TESTS'), 'live FAA network tests disabled; set FAA_LIVE_TESTS=1')
 class TestFAAChartExtraction(unittest.TestCase):
     def test_vfr_link_extraction(self):
         links = fetch_vfr_sectional_and_terminal_links(VFR_CHARTS_URL)
@@ -14,7 +16,7 @@ class TestFAAChartExtraction(unittest.TestCase):
         self.assertGreater(len(links), 0)
 
     def test_ifr_link_extraction(self):
-        links = fetch_ifr_low_high_links(IFR_CHARTS_URL, IFR_LOW_PREFIXES + IFR_HIGH_PREFIXES)
+        links = fetch_ifr_low_high_links(IFR_CHARTS_URL, IFR_ALL_PREFIXES)
         self.assertIsInstance(links, list)
         self.assertTrue(all(isinstance(l, dict) for l in links))
         self.assertGreater(len(links), 0)
@@ -8,6 +8,7 @@ This file contains workflow tests for FAA chart processing.
 import unittest
 from typing import Any
 from scripts import download_faa_charts, utils
+import io
 import os
 import shutil
 import json
@@ -34,6 +35,17 @@ class TestErrorHandling(unittest.TestCase):
         with self.assertRaises(Exception):
             utils.unzip_file(corrupt_path, self.temp_dir)
 
+    def test_failed_unzip_closes_buffer(self) -> None:
+        buf = io.BytesIO(b'notazip')
+        def bad_unzip(zip_path: Any, extract_to: str) -> None:
+            raise ValueError('bad zip')
+        with self.assertLogs(level='ERROR') as logs:
+            ok, err = utils.download_and_extract_zip('https://faa.gov/SEA.zip', self.temp_dir, self.temp_dir, lambda url, dest: buf, bad_unzip)
+        self.assertFalse(ok)
+        self.assertIn('bad zip', err)
+        self.assertTrue(buf.closed)
+        self.assertIn('https://faa.gov/SEA.zip', logs.output[0])
+
 class TestRedundantWorkAvoidance(unittest.TestCase):
     def setUp(self) -> None:
         self.temp_dir: str = tempfile.mkdtemp()
@@ -68,7 +80,6 @@ class TestMetadataBackupRestore(unittest.TestCase):
         try:
             utils.backup_and_save_metadata(data, tmp_path)
             def load_metadata_from(path: str) -> dict:
-                import json, os
                 if os.path.exists(path):
                     try:
                         with open(path, "r") as f:
@@ -1,9 +1,16 @@
 import unittest
-from scripts.download_faa_charts import load_metadata, download_and_extract_single_vfr, download_and_extract_single_ifr
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from scripts.download_faa_charts import load_metadata, download_and_extract_single_vfr, download_and_extract_single_ifr, unzip_file, process_chart_jobs, download_file, current_flags, fetch_vfr_sectional_and_terminal_links, fetch_ifr_low_high_links, clear_page_memo
 from unittest import mock
 import tempfile
 import os
+import io
 import json
+import zipfile
+import shutil
+import subprocess
+import sys
 
 class TestMetadataLoading(unittest.TestCase):
     def test_load_metadata_valid(self):
@@ -41,6 +48,14 @@ class TestMetadataLoading(unittest.TestCase):
                 self.assertEqual(loaded, {})
 
 class TestDownloadExtractFunctions(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, ignore_errors=True)
+        self.journal_path = os.path.join(tmpdir, 'faa_chart_log.ndjson')
+        patcher = mock.patch('scripts.download_faa_charts.JOURNAL_PATH', self.journal_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     @mock.patch('scripts.download_faa_charts.download_file')
     @mock.patch('scripts.download_faa_charts.unzip_file')
     def test_download_and_extract_single_vfr_success(self, mock_unzip, mock_download):
@@ -53,6 +68,8 @@ class TestDownloadExtractFunctions(unittest.TestCase):
         print(f"  success: {success}, err: {err}")
         self.assertTrue(success)
         self.assertIsNone(err)
+        with mock.patch('scripts.download_faa_charts.METADATA_PATH', os.path.join(os.path.dirname(self.journal_path), 'missing.json')):
+            self.assertIn('SEA_20250711.zip', load_metadata()['vfr'])
 
     @mock.patch('scripts.download_faa_charts.download_file')
     @mock.patch('scripts.download_faa_charts.unzip_file')
@@ -91,5 +108,232 @@ class TestDownloadExtractFunctions(unittest.TestCase):
         self.assertFalse(success)
         self.assertIn('fail', err)
 
+class TestProcessChartJobs(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, ignore_errors=True)
+        self.journal_path = os.path.join(tmpdir, 'faa_chart_log.ndjson')
+        patcher = mock.patch('scripts.download_faa_charts.JOURNAL_PATH', self.journal_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch('scripts.download_faa_charts.backup_and_save_metadata')
+    @mock.patch('scripts.download_faa_charts.download_file')
+    @mock.patch('scripts.download_faa_charts.unzip_file')
+    def test_records_only_extracted_charts(self, mock_unzip, mock_download, mock_save):
+        print("Test: process_chart_jobs records a chart only after its unzip succeeds...")
+        mock_download.side_effect = lambda url, dest_folder, **kwargs: url
+        def fake_unzip(zip_path, extract_to):
+            if zip_path.endswith('BAD.zip'):
+                raise zipfile.BadZipFile('bad')
+        mock_unzip.side_effect = fake_unzip
+        jobs = [
+            ('sectional', 'https://faa.gov/SEA_20250711.zip'),
+            ('sectional', 'https://faa.gov/BAD.zip'),
+            ('ifr_low', {'url': 'https://faa.gov/ELUS01.zip', 'chart_code': 'ELUS01', 'published_date': '2025-07-14'}),
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir, mock.patch('scripts.download_faa_charts.DOWNLOAD_DIR', tmpdir):
+            metadata = process_chart_jobs(jobs, {})
+        print(f"  metadata: {metadata}")
+        self.assertEqual(list(metadata['vfr']), ['SEA_20250711.zip'])
+        self.assertIn('ELUS01_2025-07-14', metadata['ifr_low'])
+        mock_save.assert_called_once()
+
+    def test_current_checks_use_requested_workers(self):
+        print("Test: current_flags sizes its HEAD pool from --workers...")
+        with mock.patch('scripts.download_faa_charts.ThreadPoolExecutor', wraps=ThreadPoolExecutor) as pool:
+            flags = current_flags(lambda item: item % 2 == 0, [1, 2, 3], True, workers=2)
+        print(f"  flags: {flags}")
+        self.assertEqual(flags, [False, True, False])
+        self.assertEqual(pool.call_args.kwargs['max_workers'], 2)
+
+class TestIndexPageCache(unittest.TestCase):
+    def setUp(self):
+        clear_page_memo()
+        self.addCleanup(clear_page_memo)
+
+    @mock.patch('scripts.download_faa_charts._SESSION')
+    def test_not_modified_page_uses_cached_links(self, mock_session):
+        print("Test: VFR index page 304 returns cached links...")
+        page = b'<div id="sectional"><a href="/files/SEA.zip">Seattle</a></div>'
+        mock_session.get.return_value = mock.Mock(status_code=200, content=page, headers={'ETag': '"v1"'})
+        cache = {}
+        links = fetch_vfr_sectional_and_terminal_links('https://www.faa.gov/vfr/', cache=cache)
+        self.assertEqual(links, ['https://www.faa.gov/files/SEA.zip'])
+        clear_page_memo()  # Simulate the next run
+        mock_session.get.return_value = mock.Mock(status_code=304, content=b'', headers={})
+        links = fetch_vfr_sectional_and_terminal_links('https://www.faa.gov/vfr/', cache=cache)
+        print(f"  cached links: {links}")
+        self.assertEqual(links, ['https://www.faa.gov/files/SEA.zip'])
+        self.assertEqual(mock_session.get.call_args.kwargs['headers'], {'If-None-Match': '"v1"'})
+
+class TestIfrLinkParsing(unittest.TestCase):
+    def setUp(self):
+        clear_page_memo()
+        self.addCleanup(clear_page_memo)
+
+    @mock.patch('scripts.download_faa_charts._SESSION')
+    def test_parses_matching_geotiff_rows(self, mock_session):
+        print("Test: fetch_ifr_low_high_links parses GEO-TIFF links for allowed prefixes...")
+        page = (b'<table><tr><th>Chart</th><th>Files</th></tr>'
+                b'<tr><td>ELUS1</td><td>Jul 10 2025 <a href="/ifr/ELUS1.zip">GEO-TIFF</a> <a href="/ifr/ELUS1.pdf">PDF</a></td></tr>'
+                b'<tr><td>ELAK1</td><td>Jul 10 2025 <a href="/ifr/ELAK1.zip">GEO-TIFF</a></td></tr>'
+                b'<tr><td>EHUS2</td><td>Jul 10 2025 <a href="/ifr/EHUS2.zip">GEO-TIFF</a></td></tr></table>')
+        mock_session.get.return_value = mock.Mock(status_code=200, content=page, headers={})
+        links = fetch_ifr_low_high_links('https://www.faa.gov/ifr/', ['ELUS'])
+        print(f"  links: {links}")
+        self.assertEqual(links, [{'chart_code': 'ELUS1', 'published_date': '2025-07-10', 'url': 'https://www.faa.gov/ifr/ELUS1.zip'}])
+        high = fetch_ifr_low_high_links('https://www.faa.gov/ifr/', ['EHUS'])
+        self.assertEqual([entry['chart_code'] for entry in high], ['EHUS2'])
+        self.assertEqual(mock_session.get.call_count, 1)
+
+class TestDownloadFile(unittest.TestCase):
+    @mock.patch('scripts.download_faa_charts._SESSION')
+    def test_resumes_partial_download(self, mock_session):
+        print("Test: download_file resumes a .part file with Range/If-Range...")
+        resp = mock.MagicMock(status_code=206, headers={'Content-Range': 'bytes 4-9/10'}, raw=io.BytesIO(b'567890'))
+        resp.__enter__.return_value = resp
+        mock_session.get.return_value = resp
+        with tempfile.TemporaryDirectory() as tmpdir:
+            part_path = os.path.join(tmpdir, 'ENR_L01.zip.part')
+            with open(part_path, 'wb') as f:
+                f.write(b'1234')
+            with open(part_path + '.validator', 'w') as f:
+                f.write('"abc"')
+            remote_info = {}
+            path = download_file('https://faa.gov/ENR_L01.zip', tmpdir, remote_info=remote_info)
+            headers = mock_session.get.call_args.kwargs['headers']
+            print(f"  request headers: {headers}")
+            self.assertEqual(headers, {'Range': 'bytes=4-', 'If-Range': '"abc"'})
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), b'1234567890')
+            self.assertEqual(remote_info['size'], 10)
+            self.assertEqual(os.listdir(tmpdir), ['ENR_L01.zip'])
+
+    @mock.patch('scripts.download_faa_charts.ZIP_IN_MEMORY_MAX_BYTES', 4)
+    @mock.patch('scripts.download_faa_charts._SESSION')
+    def test_interrupted_download_keeps_resumable_part(self, mock_session):
+        print("Test: an interrupted preallocated download leaves a .part of the received length...")
+        class BrokenStream(io.BytesIO):
+            def read(self, size=-1):
+                if self.tell():
+                    raise IOError('connection reset')
+                return super().read(4)
+        resp = mock.MagicMock(status_code=200, headers={'Content-Length': '10', 'ETag': '"abc"'}, raw=BrokenStream(b'1234567890'))
+        resp.__enter__.return_value = resp
+        mock_session.get.return_value = resp
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with self.assertRaises(IOError):
+                download_file('https://faa.gov/ENR_L01.zip', tmpdir)
+            part_path = os.path.join(tmpdir, 'ENR_L01.zip.part')
+            print(f"  .part size: {os.path.getsize(part_path)}")
+            self.assertEqual(os.path.getsize(part_path), 4)
+
+    def test_killed_download_keeps_resumable_part(self):
+        print("Test: a preallocated .part killed mid-write keeps the received length...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            part_path = os.path.join(tmpdir, 'ENR_L01.zip.part')
+            code = (
+                "import os, sys\n"
+                "from scripts.download_faa_charts import preallocate\n"
+                "f = open(sys.argv[1], 'wb')\n"
+                "preallocate(f, 1 << 20)\n"
+                "f.write(b'1234')\n"
+                "f.flush()\n"
+                "os._exit(1)\n"
+            )
+            repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            subprocess.run([sys.executable, '-c', code, part_path], cwd=repo_root, check=False)
+            print(f"  .part size: {os.path.getsize(part_path)}")
+            self.assertEqual(os.path.getsize(part_path), 4)
+
+    @mock.patch('scripts.download_faa_charts._SESSION')
+    def test_small_download_stays_in_memory(self, mock_session):
+        print("Test: download_file returns a buffer for small zips...")
+        resp = mock.MagicMock(status_code=200, headers={'Content-Length': '10'}, raw=io.BytesIO(b'1234567890'))
+        resp.__enter__.return_value = resp
+        mock_session.get.return_value = resp
+        with tempfile.TemporaryDirectory() as tmpdir:
+            buf = download_file('https://faa.gov/ENR_L01.zip', tmpdir)
+            self.assertEqual(buf.read(), b'1234567890')
+            self.assertEqual(os.listdir(tmpdir), [])
+            buf.close()
+        resp.raw = io.BytesIO(b'12345')
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with self.assertRaises(IOError):
+                download_file('https://faa.gov/ENR_L01.zip', tmpdir)
+
+    @mock.patch('scripts.download_faa_charts._IN_MEMORY_SLOTS', threading.BoundedSemaphore(1))
+    @mock.patch('scripts.download_faa_charts._SESSION')
+    def test_in_memory_buffers_are_capped(self, mock_session):
+        print("Test: download_file spills to disk once every in-memory slot is taken...")
+        def respond(*args, **kwargs):
+            resp = mock.MagicMock(status_code=200, headers={'Content-Length': '10'}, raw=io.BytesIO(b'1234567890'))
+            resp.__enter__.return_value = resp
+            return resp
+        mock_session.get.side_effect = respond
+        with tempfile.TemporaryDirectory() as tmpdir:
+            held = download_file('https://faa.gov/ENR_L01.zip', tmpdir)
+            spilled = download_file('https://faa.gov/ENR_L02.zip', tmpdir)
+            print(f"  second download: {spilled}")
+            self.assertEqual(spilled, os.path.join(tmpdir, 'ENR_L02.zip'))
+            held.close()
+            again = download_file('https://faa.gov/ENR_L03.zip', tmpdir)
+            self.assertEqual(again.read(), b'1234567890')
+            again.close()
+
+class TestUnzipFile(unittest.TestCase):
+    def test_unzip_in_memory_archive(self):
+        print("Test: unzip_file extracts an in-memory archive...")
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w') as zf:
+            zf.writestr('Seattle SEC.tif', b'tif-bytes')
+            zf.writestr('nested/Seattle SEC.htm', b'<html></html>')
+        buf.seek(0)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            unzip_file(buf, tmpdir)
+            extracted = sorted(os.path.relpath(os.path.join(root, f), tmpdir) for root, _, files in os.walk(tmpdir) for f in files)
+            print(f"  extracted: {extracted}")
+            self.assertEqual(extracted, sorted(['Seattle SEC.tif', os.path.join('nested', 'Seattle SEC.htm')]))
+            with open(os.path.join(tmpdir, 'Seattle SEC.tif'), 'rb') as f:
+                self.assertEqual(f.read(), b'tif-bytes')
+
+    def test_unzip_skips_members_outside_target(self):
+        print("Test: unzip_file skips members that would escape the target dir...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            zip_path = os.path.join(tmpdir, 'chart.zip')
+            with zipfile.ZipFile(zip_path, 'w') as zf:
+                zf.writestr('Seattle SEC.tif', b'tif-bytes')
+                zf.writestr('../evil.txt', b'nope')
+            out_dir = os.path.join(tmpdir, 'out')
+            unzip_file(zip_path, out_dir)
+            self.assertEqual(os.listdir(out_dir), ['Seattle SEC.tif'])
+            self.assertFalse(os.path.exists(os.path.join(tmpdir, 'evil.txt')))
+            self.assertFalse(os.path.exists(zip_path))
+
+    def test_unzip_preserves_mode_bits(self):
+        print("Test: unzip_file restores Unix permission bits...")
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w') as zf:
+            info = zipfile.ZipInfo('Seattle SEC.tfw')
+            info.external_attr = 0o640 << 16
+            zf.writestr(info, b'1.0')
+        buf.seek(0)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            unzip_file(buf, tmpdir)
+            mode = os.stat(os.path.join(tmpdir, 'Seattle SEC.tfw')).st_mode & 0o777
+            print(f"  mode: {oct(mode)}")
+            self.assertEqual(mode, 0o640)
+
+    def test_unzip_corrupt_archive_raises(self):
+        print("Test: unzip_file raises on a corrupt archive and keeps the zip...")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            zip_path = os.path.join(tmpdir, 'corrupt.zip')
+            with open(zip_path, 'wb') as f:
+                f.write(b'notazip')
+            with self.assertRaises(zipfile.BadZipFile):
+                unzip_file(zip_path, os.path.join(tmpdir, 'out'))
+            self.assertTrue(os.path.exists(zip_path))
+
 if __name__ == "__main__":
     unittest.main()
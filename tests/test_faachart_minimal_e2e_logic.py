@@ -1,6 +1,5 @@
 import unittest
 from scripts import download_faa_charts
-import re
 
 class TestChartSelectionLogic(unittest.TestCase):
     def test_vfr_url_selection(self):
@@ -23,7 +22,7 @@ class TestChartSelectionLogic(unittest.TestCase):
 
     def test_regex_date_extraction(self):
         url = 'https://faa.gov/SEA_20250711.zip'
-        m = re.search(r'(\d{4}-\d{2}-\d{2}|\d{8})', url)
+        m = download_faa_charts.URL_DATE_RE.search(url)
         self.assertIsNotNone(m)
         self.assertEqual(m.group(1), '20250711')
 